@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from pymorsecode import MorseCode, find_wav_files, get_soundfile
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+WORDS = ("the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog", "paris", "morse",
+         "code", "cq", "de", "sos", "73", "2020", "5nn", "tu")
+LENGTHS = (10, 100, 300)
+WPMS = (5, 15, 25)
+HZ = 800
+
+################## Measuring #######################
+
+def make_text(length, seed = 0):
+    """ Get a message of random words that is length characters long"""
+    rand = random.Random(seed)
+    text = ""
+    while(len(text) < length):
+        text += rand.choice(WORDS) + " "
+    return text[:length].strip()
+
+def measure(func, min_time = 0.2, repeat = 3):
+    """
+    Time func, calling it in a loop until it has run for at least min_time
+    seconds and taking the best of repeat loops, then call it once more with
+    tracemalloc to find the peak memory it allocates.  Returns the seconds
+    per call, the number of calls timed and the peak memory in bytes
+    """
+    best = None
+    calls = 0
+    for _ in range(repeat):
+        count = 0
+        start = time.perf_counter()
+        while(True):
+            func()
+            count += 1
+            elapsed = time.perf_counter() - start
+            if(elapsed >= min_time):
+                break
+        calls += count
+        if(best is None or elapsed / count < best):
+            best = elapsed / count
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, calls, peak
+
+def make_result(name, seconds, calls, peak, characters = None, samples = None, rate = None, **params):
+    """ Get the result of one benchmark with its throughput"""
+    result = {"name": name}
+    result.update(params)
+    result.update({"seconds": seconds, "calls": calls, "peak_memory": peak})
+    if(characters is not None):
+        result["characters"] = characters
+        result["chars_per_second"] = characters / seconds
+    if(samples is not None):
+        result["samples"] = samples
+        result["samples_per_second"] = samples / seconds
+        result["realtime_factor"] = samples / rate / seconds
+    return result
+
+################## Benchmarks #######################
+
+def bench_text(lengths = LENGTHS, min_time = 0.2):
+    """ Benchmark to_morse and to_string for messages of each length"""
+    results = []
+    morse = MorseCode("", hz = HZ)
+    for length in lengths:
+        text = make_text(length)
+        morse_code = morse.to_morse(text)
+        seconds, calls, peak = measure(lambda: morse.to_morse(text), min_time)
+        results.append(make_result("to_morse", seconds, calls, peak, len(text), length = length))
+        seconds, calls, peak = measure(lambda: morse.to_string(morse_code), min_time)
+        results.append(make_result("to_string", seconds, calls, peak, len(text), length = length))
+    return results
+
+def bench_render(lengths = LENGTHS, wpms = WPMS, min_time = 0.2, directory = None):
+    """
+    Benchmark get_morse_frame (the audio made before playing) and save_wav
+    for messages of each length at each wpm.  The WAV files are written to
+    directory, a temporary directory by default
+    """
+    results = []
+    with tempfile.TemporaryDirectory(dir = directory) as temp_dir:
+        file_name = os.path.join(temp_dir, "bench.wav")
+        for wpm in wpms:
+            morse = MorseCode("", wpm, HZ)
+            rate = morse.audio_format.rate
+            for length in lengths:
+                text = make_text(length)
+                morse_code = morse.to_morse(text)
+                samples = len(morse.get_morse_frame(morse_code)) // morse.audio_format.sample_width
+                seconds, calls, peak = measure(lambda: morse.get_morse_frame(morse_code), min_time)
+                results.append(make_result("get_morse_frame", seconds, calls, peak, len(text), samples, rate,
+                                           length = length, wpm = wpm))
+                # write_wav is save_wav without printing the file name
+                seconds, calls, peak = measure(lambda: morse.write_wav(file_name, morse_code), min_time)
+                results.append(make_result("save_wav", seconds, calls, peak, len(text), samples, rate,
+                                           length = length, wpm = wpm))
+    return results
+
+def bench_decode(paths = ("data",), detectors = ("zero",), min_time = 0.2, errors = None):
+    """
+    Benchmark sound_to_morse on the WAV files in paths with each detector.  A
+    file that can not be decoded with a detector is left out and errors
+    (print to stderr by default) is called with the file, detector and error
+    """
+    if(errors is None):
+        errors = lambda file_name, detector, error: print(
+            "Skipped {0} ({1}): {2}".format(file_name, detector, error), file = sys.stderr)
+    results = []
+    morse = MorseCode("", hz = HZ)
+    soundfile = get_soundfile()
+    for file_name in find_wav_files(paths):
+        try:
+            info = soundfile.info(file_name)
+        except RuntimeError as e:
+            # soundfile raises RuntimeError for a file it can not read
+            errors(file_name, None, repr(e))
+            continue
+        for detector in detectors:
+            try:
+                seconds, calls, peak = measure(lambda: morse.sound_to_morse(file_name, detector), min_time, 1)
+            except Exception as e:
+                errors(file_name, detector, repr(e))
+                continue
+            results.append(make_result("sound_to_morse", seconds, calls, peak, len(morse.morse_text), info.frames,
+                                       info.samplerate, file = os.path.basename(file_name),
+                                       detector = detector))
+    return results
+
+def run_benchmarks(lengths = LENGTHS, wpms = WPMS, paths = ("data",), detectors = ("zero",), min_time = 0.2,
+                   progress = None):
+    """
+    Run all of the benchmarks.  progress is called with the name of each
+    group of benchmarks as it starts.  Returns a dictionary of the machine
+    they ran on and the list of results
+    """
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": None if numpy is None else numpy.__version__,
+        "min_time": min_time,
+        "results": []
+    }
+    for name, bench in (("text", lambda: bench_text(lengths, min_time)),
+                        ("render", lambda: bench_render(lengths, wpms, min_time)),
+                        ("decode", lambda: bench_decode(paths, detectors, min_time))):
+        if(progress is not None):
+            progress(name)
+        report["results"].extend(bench())
+    return report
+
+################## Comparing #######################
+
+def result_key(result):
+    """ Get what identifies a benchmark, its name and parameters"""
+    return tuple(sorted((key, value) for key, value in result.items() if key in ("name", "length", "wpm", "file", "detector")))
+
+def compare(old_report, new_report):
+    """
+    Compare the results of two reports.  Returns a list of (key, old seconds,
+    new seconds, ratio) for the benchmarks in both
+    """
+    old_results = {result_key(result): result for result in old_report["results"]}
+    rows = []
+    for result in new_report["results"]:
+        old = old_results.get(result_key(result))
+        if(old is not None):
+            rows.append((result_key(result), old["seconds"], result["seconds"], result["seconds"] / old["seconds"]))
+    return rows
+
+def format_key(key):
+    """ Get a benchmark key as name(param=value, ...)"""
+    params = dict(key)
+    name = params.pop("name")
+    return "{0}({1})".format(name, ", ".join("{0}={1}".format(k, v) for k, v in params.items()))
+
+def print_report(report):
+    """ Print the results of a report as a table"""
+    for result in report["results"]:
+        line = "{0:<56} {1:>12.6f}s {2:>10.1f}KiB".format(
+            format_key(result_key(result)), result["seconds"], result["peak_memory"] / 1024)
+        if("chars_per_second" in result):
+            line += " {0:>12.0f} chars/s".format(result["chars_per_second"])
+        if("realtime_factor" in result):
+            line += " {0:>12.0f} samples/s {1:>8.1f}x realtime".format(
+                result["samples_per_second"], result["realtime_factor"])
+        print(line)
+
+def print_comparison(rows, threshold = 0.2):
+    """
+    Print a comparison of two reports, where a benchmark that got slower by
+    more than the threshold (0.2 is 20% slower) is a regression.  Returns the
+    number of regressions
+    """
+    regressions = 0
+    for key, old, new, ratio in rows:
+        slower = ratio > 1 + threshold
+        regressions += slower
+        print("{0:<56} {1:>12.6f}s {2:>12.6f}s {3:>7.2f}x{4}".format(
+            format_key(key), old, new, ratio, "  SLOWER" if slower else ""))
+    return regressions
+
+def main(argv = None):
+    """ Run the benchmarks and write the results to a JSON file"""
+    parser = argparse.ArgumentParser(description = "Benchmarks for pymorsecode")
+    parser.add_argument("paths", nargs = "*", default = ["data"], help = "WAV files or directories to decode")
+    parser.add_argument("--output", default = "benchmark.json", help = "file to write the results to")
+    parser.add_argument("--compare", default = None, help = "results of an earlier run to compare against")
+    parser.add_argument("--threshold", type = float, default = 0.2,
+                        help = "how much slower counts as a regression (0.2 is 20%%)")
+    parser.add_argument("--lengths", type = int, nargs = "+", default = list(LENGTHS),
+                        help = "message lengths in characters")
+    parser.add_argument("--wpm", type = int, nargs = "+", default = list(WPMS), help = "speeds to render at")
+    parser.add_argument("--detectors", nargs = "+", choices = MorseCode.DETECTORS, default = ["zero"],
+                        help = "detectors to decode with")
+    parser.add_argument("--min-time", type = float, default = 0.2, help = "seconds to run each benchmark for")
+    args = parser.parse_args(argv)
+    report = run_benchmarks(args.lengths, args.wpm, args.paths, args.detectors, args.min_time,
+                            lambda name: print("Running " + name + " benchmarks", file = sys.stderr))
+    print_report(report)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent = 1)
+    print("Saved the results to " + args.output)
+    if(args.compare is not None):
+        with open(args.compare) as file:
+            old_report = json.load(file)
+        if(print_comparison(compare(old_report, report), args.threshold)):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
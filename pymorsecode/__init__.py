@@ -0,0 +1,27 @@
+from .audio import AudioFormat, MorsePlayer, close_audio, get_audio, get_pyaudio, get_soundfile
+from .frozen import FrozenSlots
+from .codec import FallbackTable, MorseDecoder, MorseTree, TextCodec
+from .timing import TimingModel, TimingProfile
+from .render import AudioRenderer
+from .decode import AudioDecoder, SegmentTable
+from .listen import MorseListener
+from .morsecode import AsyncMorseCode, MorseCode
+from .batch import (RENDER_WINDOW, convert_lines, decode_batch, decode_job, decode_line, decode_stream, encode_line,
+                    find_wav_files, iter_chunks, iter_decode_manifest, iter_manifest, map_chunk, open_input,
+                    open_output, parallel_map, read_manifest, render_batch, render_job)
+from .cli import add_codec_arguments, demo, get_codec, main, print_progress, print_summary, run_command
+
+__all__ = [
+    "AudioFormat", "MorsePlayer", "close_audio", "get_audio", "get_pyaudio", "get_soundfile",
+    "FrozenSlots",
+    "FallbackTable", "MorseDecoder", "MorseTree", "TextCodec",
+    "TimingModel", "TimingProfile",
+    "AudioRenderer",
+    "AudioDecoder", "SegmentTable",
+    "MorseListener",
+    "AsyncMorseCode", "MorseCode",
+    "RENDER_WINDOW", "convert_lines", "decode_batch", "decode_job", "decode_line", "decode_stream", "encode_line",
+    "find_wav_files", "iter_chunks", "iter_decode_manifest", "iter_manifest", "map_chunk", "open_input",
+    "open_output", "parallel_map", "read_manifest", "render_batch", "render_job",
+    "add_codec_arguments", "demo", "get_codec", "main", "print_progress", "print_summary", "run_command"
+]
@@ -0,0 +1,201 @@
+import atexit
+import os
+import threading
+import time
+
+from .frozen import FrozenSlots
+
+##################### Audio Libraries #######################
+
+# the PyAudio instance shared by everything that plays or records audio
+_shared_audio = None
+_audio_lock = threading.Lock()
+
+def get_soundfile():
+    """
+    Import soundfile (libsndfile) the first time an audio file is read or
+    written, so encoding and decoding text does not need it
+    """
+    import soundfile
+    return soundfile
+
+def get_pyaudio():
+    """ Import pyaudio (PortAudio) the first time audio is played or recorded"""
+    import pyaudio
+    return pyaudio
+
+def get_audio():
+    """
+    Get the PyAudio instance shared by the whole program.  Opening PyAudio
+    looks for every audio device so it is only done the first time audio is
+    played or recorded, never when saving files (machines with no sound card
+    can still render), and it is terminated when the program exits
+    """
+    global _shared_audio
+    with _audio_lock:
+        if(_shared_audio is None):
+            _shared_audio = get_pyaudio().PyAudio()
+            atexit.register(close_audio)
+        return _shared_audio
+
+def close_audio():
+    """ Terminate the shared PyAudio instance if it was opened"""
+    global _shared_audio
+    with _audio_lock:
+        if(_shared_audio is not None):
+            _shared_audio.terminate()
+            _shared_audio = None
+
+class MorsePlayer:
+
+    CONTINUE = 0 # pyaudio.paContinue
+    COMPLETE = 1 # pyaudio.paComplete
+
+    def __init__(self, frames, sample_width = 2):
+        """
+        Plays audio frames through a single PyAudio output stream.  The stream
+        asks for audio from its own thread (a callback) so playing does not
+        block, and the frames are pulled from an iterable of buffers as they
+        are needed so the silence between elements is part of the audio
+        rather than a sleep
+
+        Parameters:
+            frames(iterator): is the buffers of audio still to be played
+            buffer(bytearray): is audio taken from frames not yet played
+            stream(Stream): is the PyAudio stream once started
+        """
+        self.frames = iter(frames)
+        self.sample_width = sample_width
+        self.buffer = bytearray()
+        self.stream = None
+
+    def callback(self, in_data, frame_count, time_info, status):
+        """ Give the stream the next frame_count frames of audio"""
+        size = frame_count * self.sample_width
+        while(len(self.buffer) < size and self.frames is not None):
+            frames = next(self.frames, None)
+            if(frames is None):
+                self.frames = None
+            else:
+                self.buffer += frames
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        if(len(data) < size):
+            return data + bytes(size - len(data)), self.COMPLETE
+        return data, self.CONTINUE
+
+    def start(self, audio, format, channels, rate):
+        """ Open the stream on a PyAudio instance and start playing"""
+        self.stream = audio.open(format = format, channels = channels, rate = rate,
+                                 output = True, stream_callback = self.callback)
+        self.stream.start_stream()
+
+    def is_playing(self):
+        """ True until all the audio has been played or it is stopped"""
+        return self.stream is not None and self.stream.is_active()
+
+    def wait(self):
+        """ Block until all the audio has been played"""
+        while(self.is_playing()):
+            time.sleep(0.05)
+        self.stop()
+
+    def stop(self):
+        """ Stop playing and close the stream"""
+        if(self.stream is not None):
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+
+
+class AudioFormat(FrozenSlots):
+
+    __slots__ = ("rate", "sample_format", "container")
+
+    RATE = 44100
+
+    # sample format: numpy dtype, bytes a sample, PyAudio format, soundfile subtype
+    SAMPLE_FORMATS = {
+        "int16": ("<i2", 2, 8, "PCM_16"),
+        "float32": ("<f4", 4, 1, "FLOAT")
+    }
+    # container: soundfile format
+    CONTAINERS = {
+        "wav": "WAV",
+        "flac": "FLAC",
+        "ogg": "OGG",
+        "raw": "RAW"
+    }
+    EXTENSIONS = {
+        ".wav": "wav",
+        ".flac": "flac",
+        ".ogg": "ogg",
+        ".oga": "ogg",
+        ".raw": "raw",
+        ".pcm": "raw"
+    }
+
+    def __init__(self, rate = RATE, sample_format = "int16", container = None):
+        """
+        How rendered morse code audio is stored.  A tone under 1000 Hz only
+        needs a sample rate of 8000, and FLAC or OGG files are a fraction of
+        the size of a WAV file.  'raw' is the samples with no header at all,
+        for piping into another program.  A container of None is taken from
+        the extension of the file written to, WAV if it is not one of
+        EXTENSIONS.  A format can not be changed once made, so it can be shared
+        by the renderers that use it
+
+        Parameters:
+            rate(int): is the number of samples a second
+            sample_format(str): is 'int16' or 'float32' (-1 to 1) samples
+            container(str): is 'wav', 'flac', 'ogg', 'raw' or None
+        """
+        if(not isinstance(rate, int) or rate < 1):
+            raise ValueError("Sample rate must be a whole number above 0")
+        if(sample_format not in self.SAMPLE_FORMATS):
+            raise ValueError("Sample format must be one of " + ", ".join(self.SAMPLE_FORMATS))
+        if(container is not None and container not in self.CONTAINERS):
+            raise ValueError("Container must be one of " + ", ".join(self.CONTAINERS))
+        self._set(rate, sample_format, container)
+
+    def __eq__(self, other):
+        return isinstance(other, AudioFormat) and self.__getstate__() == other.__getstate__()
+
+    def __hash__(self):
+        return hash(self.__getstate__())
+
+    def __repr__(self):
+        return "AudioFormat({0!r}, {1!r}, {2!r})".format(*self.__getstate__())
+
+    @property
+    def dtype(self):
+        """ numpy dtype of a sample"""
+        return self.SAMPLE_FORMATS[self.sample_format][0]
+
+    @property
+    def sample_width(self):
+        """ Number of bytes in a sample"""
+        return self.SAMPLE_FORMATS[self.sample_format][1]
+
+    @property
+    def pyaudio_format(self):
+        """ PyAudio format to play the samples with"""
+        return self.SAMPLE_FORMATS[self.sample_format][2]
+
+    @property
+    def subtype(self):
+        """ soundfile subtype to write the samples with"""
+        if(self.container == "ogg"):
+            return "VORBIS"
+        return self.SAMPLE_FORMATS[self.sample_format][3]
+
+    def for_file(self, file):
+        """
+        Get the format to write a file (name or binary file object) in, with
+        the container taken from its extension if this format has none
+        """
+        if(self.container is not None):
+            return self
+        name = getattr(file, "name", file)
+        extension = os.path.splitext(name)[1].lower() if isinstance(name, str) else ""
+        return AudioFormat(self.rate, self.sample_format, self.EXTENSIONS.get(extension, "wav"))
@@ -0,0 +1,301 @@
+import collections
+import concurrent.futures
+import contextlib
+import fileinput
+import functools
+import json
+import os
+import sys
+import time
+
+from .decode import AudioDecoder
+from .morsecode import MorseCode
+from .render import AudioRenderer
+from .timing import TimingProfile
+
+##################### Streaming #######################
+
+def iter_chunks(items, size):
+    """ Generator that yields lists of up to size items from an iterable"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if(len(chunk) >= size):
+            yield chunk
+            chunk = []
+    if(chunk):
+        yield chunk
+
+def map_chunk(function, chunk):
+    """ Apply function to each item of a chunk, run by the worker processes of parallel_map"""
+    return [function(item) for item in chunk]
+
+def parallel_map(function, items, workers = None, chunk_size = 1024):
+    """
+    Generator that yields function(item) for each item in order, across a
+    pool of worker processes (os.cpu_count() by default, 1 to run in this
+    process).  The items are read and handed out chunk_size at a time with
+    only a few chunks per worker waiting, so an endless stream such as stdin
+    can be processed with memory that does not grow.  function must be
+    defined at the top of a module so the workers can find it
+    """
+    workers = workers or os.cpu_count() or 1
+    if(workers == 1):
+        yield from map(function, items)
+        return
+    with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+        pending = collections.deque()
+        for chunk in iter_chunks(items, chunk_size):
+            pending.append(executor.submit(map_chunk, function, chunk))
+            if(len(pending) >= workers * 2):
+                yield from pending.popleft().result()
+        while(pending):
+            yield from pending.popleft().result()
+
+def encode_line(line, jsonl = False, codec = None):
+    """
+    Convert a line of text to morse code for the encode command with a
+    TextCodec (MorseCode.get_text_codec() by default).  With jsonl the line
+    is a JSON object whose "text" is converted and returned with a
+    "morse_code" added.  Returns the line to output and the error if the text
+    could not be converted or None
+    """
+    if(codec is None):
+        codec = MorseCode.get_text_codec()
+    try:
+        if(jsonl):
+            item = json.loads(line)
+            item["morse_code"] = codec.encode(item["text"]).rstrip(" ")
+            return json.dumps(item), None
+        return codec.encode(line.rstrip("\r\n")).rstrip(" "), None
+    except (ValueError, KeyError, TypeError) as e:
+        # json.JSONDecodeError is a ValueError
+        if(jsonl):
+            return json.dumps({"line": line.rstrip("\r\n"), "error": repr(e)}), repr(e)
+        return "", repr(e)
+
+def decode_line(line, jsonl = False, codec = None):
+    """
+    Convert a line of morse code to text for the decode-text command, like
+    encode_line with the "morse_code" of each JSON object converted to a
+    "text"
+    """
+    if(codec is None):
+        codec = MorseCode.get_text_codec()
+    try:
+        if(jsonl):
+            item = json.loads(line)
+            item["text"] = codec.decode(item["morse_code"]).rstrip(" ")
+            return json.dumps(item), None
+        return codec.decode(line.rstrip("\r\n")).rstrip(" "), None
+    except (ValueError, KeyError, TypeError) as e:
+        if(jsonl):
+            return json.dumps({"line": line.rstrip("\r\n"), "error": repr(e)}), repr(e)
+        return "", repr(e)
+
+##################### Batch Rendering #######################
+
+RENDER_WINDOW = 4096
+
+def render_job(job):
+    """
+    Render one (text, wpm, hz, file_name) job to an audio file, used by the
+    worker processes of render_batch.  A fifth item is the AudioFormat to
+    write (by default a WAV file, or the container of the file extension)
+    a sixth the rise time of the tones (see MorseCode.set_rise_time) and a
+    seventh the TextCodec to convert the text with.  Returns the file name,
+    number of characters, seconds of audio and the error if it failed or None
+    """
+    file_name = None
+    try:
+        job = tuple(job)
+        # the items left out take their defaults
+        text, wpm, hz, file_name, audio_format, rise_time, codec = job + (None, 0.0, None)[len(job) - 4:]
+        if(codec is None):
+            codec = MorseCode.get_text_codec()
+        renderer = AudioRenderer(wpm, hz, audio_format, rise_time)
+        frame_count = renderer.write(file_name, codec.to_standard(codec.encode(text)))
+    except Exception as e:
+        # one bad job (a bad setting, a character with no morse code or a
+        # file that can not be written) should not stop the rest of the batch
+        return file_name, 0, 0.0, repr(e)
+    return file_name, len(text), frame_count / renderer.audio_format.rate, None
+
+def render_batch(jobs, workers = None, progress = None, result = None):
+    """
+    Render many (text, wpm, hz, file_name) jobs, where wpm can be a
+    TimingProfile, with an optional fifth AudioFormat item, sixth rise time
+    and seventh TextCodec (see render_job), to audio files across a pool of
+    worker processes.  jobs can be any iterable, such as a generator reading
+    a manifest, and is read RENDER_WINDOW jobs at a time.
+    Jobs are sorted by tone and wpm within each window and handed out in
+    chunks so each worker keeps reusing the same cached element frames.
+    progress is called with the number of jobs done and the total (None if
+    jobs has no length) and result with what render_job returned for each
+    job.  Returns a summary of the files rendered and the throughput
+    """
+    total = len(jobs) if hasattr(jobs, "__len__") else None
+    workers = workers or os.cpu_count() or 1
+    chunk_size = 64 if total is None else max(1, min(64, total // (workers * 4)))
+    # wpm can be a number or a TimingProfile (or a bad value render_job will
+    # report), which only need grouping
+    ordered = (job for window in iter_chunks(jobs, RENDER_WINDOW)
+               for job in sorted(window, key = lambda job: repr(tuple(job)[2:0:-1])))
+    summary = {"files": 0, "failed": [], "characters": 0, "audio_seconds": 0.0}
+    start = time.perf_counter()
+    for done, job_result in enumerate(parallel_map(render_job, ordered, workers, chunk_size), 1):
+        file_name, characters, seconds, error = job_result
+        if(error is None):
+            summary["files"] += 1
+            summary["characters"] += characters
+            summary["audio_seconds"] += seconds
+        else:
+            summary["failed"].append((file_name, error))
+        if(result is not None):
+            result(job_result)
+        if(progress is not None):
+            progress(done, total)
+    elapsed = time.perf_counter() - start
+    summary["seconds"] = elapsed
+    summary["files_per_second"] = summary["files"] / elapsed if elapsed else 0.0
+    summary["characters_per_second"] = summary["characters"] / elapsed if elapsed else 0.0
+    summary["realtime_factor"] = summary["audio_seconds"] / elapsed if elapsed else 0.0
+    return summary
+
+##################### Batch Decoding #######################
+
+def find_wav_files(paths):
+    """ Get the WAV files in a list of files and directories"""
+    file_names = []
+    for path in paths:
+        if(os.path.isdir(path)):
+            file_names.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(".wav")))
+        else:
+            file_names.append(path)
+    return file_names
+
+def decode_job(job):
+    """
+    Decode one (file_name, detector, hz, block_size, wpm) job, used by the
+    worker processes of decode_batch.  Returns the result of
+    AudioDecoder.decode, or the file and the error if it could not be decoded
+    """
+    file_name, detector, hz, block_size, wpm = job
+    try:
+        return AudioDecoder(wpm, hz, detector, block_size).decode(file_name)
+    except Exception as e:
+        # one bad recording should not stop the rest of the batch
+        return {"file": file_name, "error": repr(e)}
+
+def decode_stream(jobs, workers = None, progress = None):
+    """
+    Generator that decodes (file_name, detector, hz, block_size) jobs across
+    a pool of worker processes and yields each result (see decode_job) in
+    order as soon as it and the ones before it are done.  progress is called
+    with the number of files done and the total (None if jobs has no length)
+    """
+    total = len(jobs) if hasattr(jobs, "__len__") else None
+    for done, result in enumerate(parallel_map(decode_job, jobs, workers, 1), 1):
+        if(progress is not None):
+            progress(done, total)
+        yield result
+
+def decode_batch(paths, workers = None, detector = "zero", hz = 800, progress = None, block_size = None, wpm = None):
+    """
+    Decode the WAV files in a list of files and directories across a pool of
+    worker processes.  hz is the tone listened for by the goertzel detector.
+    progress is called with the number of files done and the total.
+    block_size reads each file that many samples at a time (see
+    AudioDecoder.decode_blocks) and wpm is the expected speed, or a
+    TimingProfile (see AudioDecoder).  Returns a list of results (see
+    MorseCode.decode_audio) in file order
+    """
+    jobs = [(file_name, detector, hz, block_size, wpm) for file_name in find_wav_files(paths)]
+    return list(decode_stream(jobs, workers, progress))
+
+
+def iter_manifest(file, failed = None):
+    """
+    Generator that reads render jobs from a file of JSON lines such as
+    {"text": "paris", "wpm": 10, "hz": 800, "file": "paris.wav"}
+    where wpm and hz are optional (default 10 and 800).  effective_wpm gives
+    Farnsworth timing, with the letters sent at wpm.  A line that can not be
+    read is left out and its (line number, error) added to the failed list,
+    or raises if there is none
+    """
+    for number, line in enumerate(file, 1):
+        if(not line.strip()):
+            continue
+        try:
+            item = json.loads(line)
+            wpm = item.get("wpm", 10)
+            if(item.get("effective_wpm") is not None):
+                wpm = TimingProfile(wpm, item["effective_wpm"])
+            job = (item["text"], wpm, item.get("hz", 800), item["file"])
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            # json.JSONDecodeError is a ValueError, a line that is not an
+            # object raises AttributeError
+            if(failed is None):
+                raise
+            failed.append((number, repr(e)))
+            continue
+        yield job
+
+def read_manifest(file, failed = None):
+    """ Read the render jobs of a manifest into a list (see iter_manifest)"""
+    return list(iter_manifest(file, failed))
+
+def iter_decode_manifest(file, detector = "zero", hz = 800, block_size = None, wpm = None, failed = None):
+    """
+    Generator that reads decode jobs from a file of JSON lines such as
+    {"file": "paris.wav", "detector": "goertzel", "hz": 700, "wpm": 40},
+    where detector, hz, block_size and wpm are optional (default the
+    arguments).  A line that can not be read is left out and its (line
+    number, error) added to the failed list, or raises if there is none
+    """
+    for number, line in enumerate(file, 1):
+        if(not line.strip()):
+            continue
+        try:
+            item = json.loads(line)
+            job = (item["file"], item.get("detector", detector), item.get("hz", hz),
+                   item.get("block_size", block_size), item.get("wpm", wpm))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            if(failed is None):
+                raise
+            failed.append((number, repr(e)))
+            continue
+        yield job
+
+def open_input(file_name):
+    """ Open a file to read lines from, stdin for '-'"""
+    if(file_name == "-"):
+        return contextlib.nullcontext(sys.stdin)
+    return open(file_name)
+
+def open_output(file_name):
+    """ Open a file to write lines to, stdout for None or '-'"""
+    if(file_name is None or file_name == "-"):
+        return contextlib.nullcontext(sys.stdout)
+    return open(file_name, "w")
+
+def convert_lines(function, files, output, workers = 1, jsonl = False, codec = None):
+    """
+    Write function(line) (encode_line or decode_line) for each line of a
+    list of files ('-' for stdin) to the output file as the lines are read
+    with a TextCodec (MorseCode.get_text_codec() by default).
+    Returns the number of lines that could not be converted
+    """
+    lines = fileinput.input(files or ("-",))
+    failed = 0
+    try:
+        results = parallel_map(functools.partial(function, jsonl = jsonl, codec = codec), lines, workers)
+        for number, (line, error) in enumerate(results, 1):
+            output.write(line + "\n")
+            if(error is not None):
+                failed += 1
+                print("Line {0}: {1}".format(number, error), file = sys.stderr)
+    finally:
+        lines.close()
+    return failed
@@ -0,0 +1,202 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+from .audio import AudioFormat
+from .batch import (convert_lines, decode_line, decode_stream, encode_line, find_wav_files, iter_decode_manifest,
+                    iter_manifest, open_input, open_output, render_batch)
+from .codec import TextCodec
+from .decode import AudioDecoder
+from .listen import MorseListener
+from .morsecode import MorseCode
+
+##################### Command Line #######################
+
+def add_codec_arguments(parser):
+    """ Add the arguments for the TextCodec of a command"""
+    parser.add_argument("--alphabets", nargs = "*", choices = tuple(TextCodec.ALPHABETS),
+                        default = list(TextCodec.DEFAULT_ALPHABETS),
+                        help = "alphabets used as well as the letters and numbers")
+    parser.add_argument("--unknown", choices = TextCodec.UNKNOWN, default = "raise",
+                        help = "what to do with a character that has no morse code")
+    parser.add_argument("--replacement", default = "?", help = "character put in place of unknown ones")
+
+def get_codec(args):
+    """ Get the TextCodec for the arguments of a command"""
+    return MorseCode.get_text_codec(args.alphabets, args.unknown, args.replacement)
+
+def print_progress(done, total):
+    """ Show how many jobs are done on one line of stderr"""
+    if(total is None):
+        if(done % 100 == 0):
+            print("\rDone {0}".format(done), end = "", file = sys.stderr)
+    elif(done == total or done % 100 == 0):
+        print("\rDone {0}/{1}".format(done, total), end = "\n" if done == total else "", file = sys.stderr)
+
+def print_summary(summary, file = None):
+    """ Print the summary of a batch render"""
+    print("Rendered {0} files ({1} failed) in {2:.2f}s".format(
+        summary["files"], len(summary["failed"]), summary["seconds"]), file = file)
+    print("{0:.1f} files/s, {1:.0f} chars/s, {2:.1f}x realtime".format(
+        summary["files_per_second"], summary["characters_per_second"], summary["realtime_factor"]), file = file)
+    for file_name, error in summary["failed"]:
+        print("Failed {0}: {1}".format(file_name, error), file = file)
+
+def demo():
+    """ Play a sample of morse code"""
+    # -- .- - - .... . .--  --. .-. .- -. -  matthew grant
+    morse = MorseCode("Kayleb Walter", 7, 500)
+    # Open a file and get text from the morsecode audio
+    #morse.sound_to_morse("test5wpm500.wav")
+    # Get morse code for the given text
+    #morse_code = morse.to_morse("Genavive Grant")
+    # Convert morse code to text 
+    #morse_text = morse.to_string(morse_code)
+    # Play audio of morse code
+    morse.play_morse()
+    # save audio version of morse code to specified file
+    #morse.save_wav("test7wpm500.wav")
+    # show textstr and morse_code
+    print(morse.morse_text)
+    print(morse.morse_code)
+    #soundinfo()
+
+def main(argv = None):
+    """
+    The main programming entry.  Returns the exit status, 1 if any line or
+    file failed
+    """
+    parser = argparse.ArgumentParser(prog = "python -m pymorsecode", description = "Morse code generator and reader")
+    commands = parser.add_subparsers(dest = "command")
+    encode = commands.add_parser("encode", help = "convert lines of text to lines of morse code")
+    decode_text = commands.add_parser("decode-text", help = "convert lines of morse code to lines of text")
+    for command, field in ((encode, "text"), (decode_text, "morse_code")):
+        command.add_argument("files", nargs = "*", help = "files to read the lines from (default stdin)")
+        command.add_argument("--output", default = None, help = "file to write the lines to (default stdout)")
+        command.add_argument("--jobs", type = int, default = 1, help = "number of worker processes")
+        command.add_argument("--jsonl", action = "store_true",
+                             help = "lines are JSON objects, the " + field + " of each is converted")
+        add_codec_arguments(command)
+    render = commands.add_parser("render", help = "render a manifest of JSON lines to audio files")
+    render.add_argument("manifest", help = "file of JSON lines with text, wpm, hz and file ('-' for stdin)")
+    render.add_argument("--jobs", type = int, default = None, help = "number of worker processes")
+    render.add_argument("--output", default = None,
+                        help = "file to write a JSON line for each file rendered to ('-' for stdout)")
+    render.add_argument("--rate", type = int, default = MorseCode.RATE, help = "sample rate of the audio")
+    render.add_argument("--sample-format", choices = tuple(AudioFormat.SAMPLE_FORMATS), default = "int16",
+                        help = "format of each sample")
+    render.add_argument("--container", choices = tuple(AudioFormat.CONTAINERS), default = None,
+                        help = "file format (default from the file extension, WAV otherwise)")
+    render.add_argument("--rise-time", type = float, default = 0.0,
+                        help = "seconds each tone takes to rise and fall, 0.005 removes key clicks")
+    add_codec_arguments(render)
+    decode = commands.add_parser("decode-audio", help = "decode WAV files and directories of WAV files")
+    decode.add_argument("paths", nargs = "*", help = "WAV files or directories")
+    decode.add_argument("--manifest", default = None,
+                        help = "file of JSON lines with file and optional detector, hz, block_size and wpm ('-' for stdin)")
+    decode.add_argument("--jobs", type = int, default = None, help = "number of worker processes")
+    decode.add_argument("--detector", choices = AudioDecoder.DETECTORS, default = "zero",
+                        help = "how tone is told apart from silence")
+    decode.add_argument("--hz", type = int, default = 800, help = "tone listened for by the goertzel detector")
+    decode.add_argument("--wpm", type = float, default = None,
+                        help = "expected speed, which decides between dots and dashes when all the tones are alike")
+    decode.add_argument("--output", default = None, help = "file to write the JSON lines to (default stdout)")
+    decode.add_argument("--block-size", type = int, default = None,
+                        help = "read each file this many samples at a time, for long recordings")
+    listen = commands.add_parser("listen", help = "decode raw 16 bit mono PCM from stdin (or a microphone) as it arrives")
+    listen.add_argument("--rate", type = int, default = 44100, help = "sample rate of the audio")
+    listen.add_argument("--wpm", type = int, default = 10, help = "expected speed, followed as it changes")
+    listen.add_argument("--hz", type = int, default = 800, help = "tone listened for by the goertzel detector")
+    listen.add_argument("--detector", choices = ("goertzel", "rms"), default = "goertzel",
+                        help = "how tone is told apart from silence")
+    listen.add_argument("--microphone", action = "store_true", help = "listen to the default input device")
+    bench = commands.add_parser("bench", help = "run the benchmarks (see benchmark.py --help)")
+    bench.add_argument("args", nargs = argparse.REMAINDER, help = "arguments for benchmark.py")
+    args = parser.parse_args(argv)
+    try:
+        return run_command(args)
+    except BrokenPipeError:
+        # the program reading the output (like head) stopped, which is not an error
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+
+def run_command(args):
+    """ Run the command parsed by main, returns the exit status"""
+    if(args.command in ("encode", "decode-text")):
+        function = encode_line if args.command == "encode" else decode_line
+        with open_output(args.output) as output:
+            failed = convert_lines(function, args.files, output, args.jobs, args.jsonl, get_codec(args))
+        return 1 if failed else 0
+    elif(args.command == "render"):
+        audio_format = AudioFormat(args.rate, args.sample_format, args.container)
+        bad_lines = []
+        with open_input(args.manifest) as file, open_output(args.output) as output:
+            codec = get_codec(args)
+            jobs = (job + (audio_format, args.rise_time, codec) for job in iter_manifest(file, bad_lines))
+            def write_result(result):
+                file_name, characters, seconds, error = result
+                output.write(json.dumps({"file": file_name, "characters": characters,
+                                         "seconds": seconds, "error": error}) + "\n")
+            summary = render_batch(jobs, args.jobs, print_progress, write_result if args.output else None)
+            if(args.output):
+                for number, error in bad_lines:
+                    output.write(json.dumps({"line": number, "error": error}) + "\n")
+        summary["failed"].extend(("line {0}".format(number), error) for number, error in bad_lines)
+        if(summary["files"] + len(summary["failed"]) >= 100):
+            # finish the line of progress, which has no total to end it
+            print("", file = sys.stderr)
+        # like the progress the summary goes to stderr, stdout can be one of
+        # the files being rendered or the results
+        print_summary(summary, sys.stderr)
+        return 1 if summary["failed"] else 0
+    elif(args.command == "decode-audio"):
+        if(not args.paths and args.manifest is None):
+            print("decode-audio needs WAV files, directories or a --manifest", file = sys.stderr)
+            return 2
+        done = failed = 0
+        bad_lines = []
+        def write_bad_lines():
+            # manifest lines that could not be read, reported as they are found
+            count = len(bad_lines)
+            for number, error in bad_lines:
+                print("Line {0}: {1}".format(number, error), file = sys.stderr)
+                output.write(json.dumps({"line": number, "error": error}) + "\n")
+            del bad_lines[:]
+            return count
+        with contextlib.ExitStack() as stack:
+            output = stack.enter_context(open_output(args.output))
+            if(args.manifest is not None):
+                file = stack.enter_context(open_input(args.manifest))
+                jobs = iter_decode_manifest(file, args.detector, args.hz, args.block_size, args.wpm, bad_lines)
+            else:
+                jobs = [(file_name, args.detector, args.hz, args.block_size, args.wpm)
+                        for file_name in find_wav_files(args.paths)]
+            for done, result in enumerate(decode_stream(jobs, args.jobs, print_progress), 1):
+                failed += write_bad_lines()
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+                failed += "error" in result
+            failed += write_bad_lines()
+        if(args.manifest is not None and done >= 100):
+            print("", file = sys.stderr)
+        return 1 if failed else 0
+    elif(args.command == "listen"):
+        listener = MorseListener(args.rate, args.wpm, args.hz, args.detector)
+        if(args.microphone):
+            texts = listener.listen_microphone()
+        else:
+            texts = listener.listen_file(sys.stdin.buffer)
+        try:
+            for text in texts:
+                print(text, end = "", flush = True)
+        except KeyboardInterrupt:
+            pass
+        print()
+    elif(args.command == "bench"):
+        import benchmark
+        return benchmark.main(args.args)
+    else:
+        demo()
+    return 0
@@ -0,0 +1,333 @@
+import re
+import types
+
+from .frozen import FrozenSlots
+
+class MorseTree(FrozenSlots):
+
+    __slots__ = ("letters", "dot", "dash")
+
+    def __init__(self, morse_table, dot = ".", dash = "-"):
+        """
+        Binary tree of the letters in a morse table stored as a tuple, where a
+        dot moves from node n to node 2n + 1 and a dash to node 2n + 2, so a
+        letter is found by walking its symbols from the root (node 0).  A
+        tree can not be changed once made, so the one of a TextCodec can be
+        shared by all of its decoders
+
+        Parameters:
+            letters(tuple): is the letter at each node, "" if there is none
+            dot(str): is the symbol used for a dot
+            dash(str): is the symbol used for a dash
+        """
+        depth = max([len(code) for code in morse_table.values()], default = 0)
+        letters = [""] * (2 ** (depth + 1) - 1)
+        for letter, code in morse_table.items():
+            node = 0
+            for symbol in code:
+                if(symbol == dot):
+                    node = 2 * node + 1
+                elif(symbol == dash):
+                    node = 2 * node + 2
+                else:
+                    # a code with any other symbol can never be walked to
+                    break
+            else:
+                letters[node] = letter
+        self._set(tuple(letters), dot, dash)
+
+    def step(self, node, symbol):
+        """ Move from a node to its child for a symbol, -1 if there is none"""
+        if(node < 0):
+            return -1
+        if(symbol == self.dot):
+            node = 2 * node + 1
+        elif(symbol == self.dash):
+            node = 2 * node + 2
+        else:
+            return -1
+        if(node >= len(self.letters)):
+            return -1
+        return node
+
+    def get_letter(self, node):
+        """ Get the letter at a node, "" if there is none"""
+        if(node < 0):
+            return ""
+        return self.letters[node]
+
+
+class MorseDecoder:
+
+    def __init__(self, tree):
+        """
+        Decode morse code symbols to text as they arrive by walking a MorseTree,
+        so the morse code never has to be split into words and letters.  A
+        letter is output on the space after it and a space is output for every
+        two spaces in a row (the gap between words)
+
+        Parameters:
+            tree(MorseTree): is the tree of letters to decode with
+            node(int): is the node of the letter being received
+            spaces(int): is the number of spaces received in a row
+        """
+        self.tree = tree
+        self.node = 0
+        self.spaces = 0
+
+    def feed(self, symbols):
+        """ Decode a chunk of morse code, returns the text for finished letters"""
+        letters = self.tree.letters
+        size = len(letters)
+        dot = self.tree.dot
+        dash = self.tree.dash
+        node = self.node
+        spaces = self.spaces
+        text = []
+        # the tree walk of MorseTree.step is inlined as this is the hot loop
+        for symbol in symbols:
+            if(symbol == " "):
+                if(spaces == 0):
+                    text.append(letters[node] if node >= 0 else "")
+                    node = 0
+                spaces += 1
+                if(spaces % 2 == 0):
+                    text.append(" ")
+                continue
+            spaces = 0
+            if(node < 0):
+                continue
+            if(symbol == dot):
+                node = 2 * node + 1
+            elif(symbol == dash):
+                node = 2 * node + 2
+            elif(symbol.isspace()):
+                continue
+            else:
+                node = -1
+            if(node >= size):
+                node = -1
+        self.node = node
+        self.spaces = spaces
+        return "".join(text)
+
+    def flush(self):
+        """ Finish the morse code received so far, returns the rest of the text"""
+        text = ""
+        if(self.spaces == 0):
+            text = self.tree.get_letter(self.node)
+        text += " "
+        self.node = 0
+        self.spaces = 0
+        return text
+
+    def decode(self, mcode):
+        """ Decode a whole string of morse code to text"""
+        return self.feed(mcode) + self.flush()
+
+
+class FallbackTable(dict):
+
+    __slots__ = ("default",)
+
+    def __init__(self, table, default):
+        """
+        Lookup table that gives default for a key it does not have, so a
+        whole string can be looked up with map(table.__getitem__, ...)
+        without catching KeyError for each character
+
+        Parameters:
+            default(str): is the value of a missing key
+        """
+        super().__init__(table)
+        self.default = default
+
+    def __missing__(self, key):
+        return self.default
+
+
+class TextCodec(FrozenSlots):
+
+    __slots__ = ("table", "alphabets", "unknown", "replacement", "dot", "_encode_table", "_reverse_table",
+                 "_token_starts", "_token_pattern", "tree")
+
+    UNKNOWN = ("raise", "skip", "replace")
+    DEFAULT_ALPHABETS = ("punctuation", "prosigns", "international")
+    # extra tables added to the letters and numbers of MorseCode.morse, a
+    # prosign is written as its letters in angle brackets and sent as one
+    # character with no gaps between its letters
+    ALPHABETS = {
+        "punctuation": {
+            ".": ".-.-.-", ",": "--..--", "?": "..--..", "'": ".----.", "!": "-.-.--", "/": "-..-.",
+            "(": "-.--.", ")": "-.--.-", "&": ".-...", ":": "---...", ";": "-.-.-.", "=": "-...-",
+            "+": ".-.-.", "-": "-....-", "_": "..--.-", '"': ".-..-.", "$": "...-..-", "@": ".--.-."
+        },
+        "prosigns": {
+            "<ar>": ".-.-.", "<as>": ".-...", "<bk>": "-...-.-", "<bt>": "-...-", "<cl>": "-.-..-..",
+            "<hh>": "........", "<ka>": "-.-.-", "<kn>": "-.--.", "<sk>": "...-.-", "<sos>": "...---...",
+            "<ve>": "...-."
+        },
+        "international": {
+            "à": ".--.-", "å": ".--.-", "ä": ".-.-", "æ": ".-.-", "ą": ".-.-", "ç": "-.-..", "ć": "-.-..",
+            "ĉ": "-.-..", "ð": "..--.", "é": "..-..", "ę": "..-..", "è": ".-..-", "ł": ".-..-", "ĝ": "--.-.",
+            "ĥ": "----", "š": "----", "ĵ": ".---.", "ñ": "--.--", "ń": "--.--", "ö": "---.", "ó": "---.",
+            "ø": "---.", "ŝ": "...-.", "ś": "...-...", "þ": ".--..", "ü": "..--", "ŭ": "..--", "ź": "--..-.",
+            "ż": "--..-", "ß": "...--.."
+        },
+        "cyrillic": {
+            "а": ".-", "б": "-...", "в": ".--", "г": "--.", "д": "-..", "е": ".", "ё": ".", "ж": "...-",
+            "з": "--..", "и": "..", "й": ".---", "к": "-.-", "л": ".-..", "м": "--", "н": "-.", "о": "---",
+            "п": ".--.", "р": ".-.", "с": "...", "т": "-", "у": "..-", "ф": "..-.", "х": "....", "ц": "-.-.",
+            "ч": "---.", "ш": "----", "щ": "--.-", "ъ": "--.--", "ы": "-.--", "ь": "-..-", "э": "..-..",
+            "ю": "..--", "я": ".-.-"
+        },
+        "greek": {
+            "α": ".-", "β": "-...", "γ": "--.", "δ": "-..", "ε": ".", "ζ": "--..", "η": "....", "θ": "-.-.",
+            "ι": "..", "κ": "-.-", "λ": ".-..", "μ": "--", "ν": "-.", "ξ": "-..-", "ο": "---", "π": ".--.",
+            "ρ": ".-.", "σ": "...", "ς": "...", "τ": "-", "υ": "-.--", "φ": "..-.", "χ": "----", "ψ": "--.-",
+            "ω": ".--"
+        }
+    }
+
+    def __init__(self, table, alphabets = (), unknown = "raise", replacement = "?", dot = "."):
+        """
+        Converts text to and from morse code with a morse table and any of
+        the extra ALPHABETS.  The lookup tables are built once when the codec
+        is made and can not be changed, so one codec can be shared by every
+        thread of a program.  Letters from different alphabets can share a
+        code, when decoding the alphabets listed first win and then the table
+        (none of the DEFAULT_ALPHABETS share a code with a letter or number)
+
+        Parameters:
+            table(mapping): is the morse code of each letter
+            alphabets(tuple): is the names of the ALPHABETS added to table
+            unknown(str): is what is done with a character that has no morse
+                code, 'raise' a KeyError, 'skip' it or 'replace' it with the
+                code of replacement
+            replacement(str): is the character put in place of unknown ones
+            dot(str): is the symbol written for a dot, "." or another single
+                character such as "*" (see to_standard)
+            _encode_table(dict): is the morse code of each character with the
+                space after it, and a space for the space between words
+            _reverse_table(dict): is the character of each morse code
+            _token_starts(str): is the first character of each character
+                written with more than one letter (the prosigns)
+            _token_pattern(Pattern): splits text into those characters
+            tree(MorseTree): is the reverse table as a tree for MorseDecoder
+        """
+        for name in alphabets:
+            if(name not in self.ALPHABETS):
+                raise ValueError("Alphabet must be one of " + ", ".join(self.ALPHABETS))
+        if(unknown not in self.UNKNOWN):
+            raise ValueError("Unknown must be one of " + ", ".join(self.UNKNOWN))
+        if(len(dot) != 1 or dot in "- "):
+            raise ValueError("Dot must be a single character other than a dash or space")
+        tables = [self.get_table(self.ALPHABETS[name], dot) for name in alphabets]
+        codes = self.get_table(table, dot)
+        for letters in tables:
+            for letter, code in letters.items():
+                codes.setdefault(letter, code)
+        if(unknown == "replace" and replacement not in codes):
+            raise ValueError("Replacement must have a morse code")
+        encode_table = {letter: code + " " for letter, code in codes.items()}
+        encode_table[" "] = " "
+        if(unknown == "skip"):
+            encode_table = FallbackTable(encode_table, "")
+        elif(unknown == "replace"):
+            encode_table = FallbackTable(encode_table, encode_table[replacement])
+        # morse code with no character is left out of the text, or replaced
+        reverse_table = FallbackTable({}, replacement if unknown == "replace" else "")
+        for letters in tables + [self.get_table(table, dot)]:
+            for letter, code in letters.items():
+                reverse_table.setdefault(code, letter)
+        reverse_table[""] = ""
+        tokens = sorted([letter for letter in codes if len(letter) > 1], key = len, reverse = True)
+        token_pattern = None
+        if(tokens):
+            token_pattern = re.compile("|".join(map(re.escape, tokens)) + "|.", re.S)
+        self._set(types.MappingProxyType(dict(table)), tuple(alphabets), unknown, replacement, dot, encode_table,
+                  reverse_table, "".join(sorted(set(token[0] for token in tokens))), token_pattern,
+                  MorseTree({letter: code for code, letter in reverse_table.items() if code}, dot))
+
+    def __reduce__(self):
+        # the lookup tables are rebuilt from the settings
+        return (TextCodec, (dict(self.table), self.alphabets, self.unknown, self.replacement, self.dot))
+
+    @staticmethod
+    def get_table(table, dot):
+        """ Get a copy of a morse table with its dots written as dot"""
+        if(dot == "."):
+            return dict(table)
+        return {letter: code.replace(".", dot) for letter, code in table.items()}
+
+    def to_standard(self, mcode):
+        """ Get morse code written with this codec's dot as "." for AudioRenderer"""
+        if(self.dot == "."):
+            return mcode
+        return mcode.replace(self.dot, ".")
+
+    def from_standard(self, mcode):
+        """ Get morse code written with "." (like the audio decoders find) in this codec's dot"""
+        if(self.dot == "."):
+            return mcode
+        return mcode.replace(".", self.dot)
+
+    @property
+    def encode_table(self):
+        """ Read only view of the morse code of each character with the space after it"""
+        return types.MappingProxyType(self._encode_table)
+
+    @property
+    def reverse_table(self):
+        """ Read only view of the character of each morse code"""
+        return types.MappingProxyType(self._reverse_table)
+
+    def split(self, text):
+        """
+        Get the characters of lower case text, a string if none of them are
+        written with more than one letter or a list if any are
+        """
+        for start in self._token_starts:
+            if(start in text):
+                return self._token_pattern.findall(text)
+        return text
+
+    def encode(self, text):
+        """
+        Convert text to morse code, with characters that have no morse code
+        raising a KeyError, left out or replaced (see unknown)
+        """
+        return "".join(map(self._encode_table.__getitem__, self.split(text.lower())))
+
+    def encode_many(self, texts):
+        """ Convert each text in an iterable to morse code, returns a list of morse code"""
+        encode = self._encode_table.__getitem__
+        return ["".join(map(encode, self.split(text.lower()))) for text in texts]
+
+    def decode(self, mcode):
+        """
+        Convert morse code to text.  Words are split by double spaces and
+        letters by single spaces and each letter is looked up in the reverse
+        table, morse code with no character is left out (or replaced if
+        unknown is 'replace', it never raises as audio is often garbled).  Use
+        get_decoder to decode morse code that arrives a piece at a time
+        """
+        reverse = self._reverse_table.__getitem__
+        return "".join(
+            "".join(map(reverse, word.strip().split(" "))) + " "
+            for word in mcode.split("  "))
+
+    def decode_many(self, mcodes):
+        """ Convert each morse code in an iterable to text, returns a list of text"""
+        return [self.decode(mcode) for mcode in mcodes]
+
+    def get_letter(self, mcode):
+        """ Get the character for the morse code of one character (see decode)"""
+        return self._reverse_table[mcode]
+
+    def get_decoder(self):
+        """
+        Get a MorseDecoder to decode morse code as it is received, which
+        leaves out morse code with no character
+        """
+        return MorseDecoder(self.tree)
@@ -0,0 +1,540 @@
+import array
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .audio import get_soundfile
+from .frozen import FrozenSlots
+from .timing import TimingModel, TimingProfile
+
+class SegmentTable:
+
+    __slots__ = ("states", "starts", "stops", "durations")
+
+    def __init__(self, states = (), starts = (), stops = (), durations = ()):
+        """
+        The runs of tone and absence of tone found in audio data, stored as
+        four parallel typed arrays rather than a list for every run, so a long
+        recording takes 25 bytes a run.  A run is read back as a tuple of
+        (state, start, stop, duration)
+
+        Parameters:
+            states(array): is True (1) for a tone and False (0) for no tone
+            starts(array): is the first sample of each run
+            stops(array): is the last sample of each run
+            durations(array): is the duration of each run in seconds
+        """
+        self.states = array.array('b', states)
+        self.starts = array.array('q', starts)
+        self.stops = array.array('q', stops)
+        self.durations = array.array('d', durations)
+
+    @classmethod
+    def from_arrays(cls, states, starts, stops, durations):
+        """ Get a table from four numpy arrays without going through Python objects"""
+        table = cls()
+        table.states.frombytes(numpy.asarray(states, dtype=numpy.int8).tobytes())
+        table.starts.frombytes(numpy.asarray(starts, dtype=numpy.int64).tobytes())
+        table.stops.frombytes(numpy.asarray(stops, dtype=numpy.int64).tobytes())
+        table.durations.frombytes(numpy.asarray(durations, dtype=numpy.float64).tobytes())
+        return table
+
+    def __len__(self):
+        return len(self.states)
+
+    def __getitem__(self, index):
+        return (self.states[index] == 1, self.starts[index], self.stops[index], self.durations[index])
+
+    def __iter__(self):
+        for state, start, stop, duration in zip(self.states, self.starts, self.stops, self.durations):
+            yield (state == 1, start, stop, duration)
+
+    def append(self, state, start, stop, duration):
+        """ Add a run to the end of the table"""
+        self.states.append(state)
+        self.starts.append(start)
+        self.stops.append(stop)
+        self.durations.append(duration)
+
+    def extend(self, table):
+        """ Add the runs of another table to the end of the table"""
+        self.states.extend(table.states)
+        self.starts.extend(table.starts)
+        self.stops.extend(table.stops)
+        self.durations.extend(table.durations)
+
+    def get_durations(self, state):
+        """ Get the durations of the runs of tone (state True) or no tone"""
+        return [duration for on, duration in zip(self.states, self.durations) if on == state]
+
+    def without_leading_off(self):
+        """ Get the table without its first run if that run is not a tone"""
+        if(len(self.states) == 0 or self.states[0]):
+            return self
+        table = SegmentTable()
+        table.states = self.states[1:]
+        table.starts = self.starts[1:]
+        table.stops = self.stops[1:]
+        table.durations = self.durations[1:]
+        return table
+
+    def to_list(self):
+        """ Get the runs in the old list format, [['on', start, stop, duration], ...]"""
+        return [["on" if state else "off", start, stop, duration] for state, start, stop, duration in self]
+
+    @classmethod
+    def from_list(cls, process_list):
+        """ Get a table from runs in the old list format (see to_list)"""
+        table = cls()
+        for state, start, stop, duration in process_list:
+            table.append(state == "on", start, stop, duration)
+        return table
+
+
+class AudioDecoder(FrozenSlots):
+
+    __slots__ = ("profile", "tone", "detector", "block_size", "codec")
+
+    DETECTORS = ("zero", "goertzel", "rms")
+    DETECTOR_WINDOW = 0.005
+    DETECTOR_HOP = 0.001
+    PEAK_LENGTH = 0.02
+    MIN_SNR = 5.0
+
+    def __init__(self, profile = None, tone = 800, detector = "zero", block_size = None, codec = None):
+        """
+        Decodes morse code audio files and samples.  Everything it decodes
+        with is set when it is made and can not be changed, and everything
+        found while decoding is kept by the call doing it, so one decoder can
+        be shared by every thread of a pool
+
+        Parameters:
+            profile(TimingProfile): is the expected timing, or the wpm of a
+                standard one (10 by default), which widens the speeds
+                searched (see get_unit_range)
+            tone(float): is the frequency the goertzel detector listens for
+            detector(str): is how tone is told apart from silence, 'zero',
+                'goertzel' or 'rms' (see MorseCode.sound_to_morse)
+            block_size(int): is the number of samples to read at a time (see
+                decode_blocks), None to read the whole file
+            codec(TextCodec): converts the morse code found to text, the one
+                of MorseCode by default
+        """
+        if(not isinstance(profile, TimingProfile)):
+            profile = TimingProfile(10 if profile is None else profile)
+        if(tone <= 0):
+            raise ValueError("Tone must be above 0")
+        if(detector not in self.DETECTORS):
+            raise ValueError("Detector must be one of " + ", ".join(self.DETECTORS))
+        if(block_size is not None and block_size < 1):
+            raise ValueError("Block size must be at least 1")
+        if(codec is None):
+            # MorseCode is built on the decoder so it is imported when needed
+            from .morsecode import MorseCode
+            codec = MorseCode.get_text_codec()
+        self._set(profile, tone, detector, block_size, codec)
+
+    def decode(self, file_name):
+        """
+        Decode a morse code audio(wav) file, read block_size samples at a time
+        if it is set.  Returns a dictionary of the file, its morse code and
+        text, its duration and sample rate, the tone and gap durations found
+        and the dot length and wpm they work out to
+        """
+        if(self.block_size is not None):
+            return self.decode_blocks(file_name)
+        soundfile = get_soundfile()
+        audio_samples, sample_rate  = soundfile.read(file_name, dtype='int16')
+        return self.decode_samples(audio_samples, sample_rate, file_name)
+
+    def decode_samples(self, audio_samples, sample_rate, file_name = None):
+        """ Decode 16 bit mono audio samples already in memory, returns the same dictionary as decode"""
+        if(self.detector == "zero"):
+            sample_list = self.get_samples(audio_samples, sample_rate)
+            process_list = self.fix_zero_crossing(sample_list, sample_rate)
+        else:
+            process_list = self.get_envelope_samples(audio_samples, sample_rate)
+        process_list = process_list.without_leading_off()
+        timing = self.fit_timing(process_list)
+        morse_code = self.timing_to_morse(process_list, timing)
+        return self.decode_result(file_name, morse_code, len(audio_samples), sample_rate, timing)
+
+    def decode_blocks(self, file_name):
+        """
+        Decode a morse code audio(wav) file read block_size samples at a time
+        (65536 if it is not set) so the memory needed does not grow with the
+        length of the recording.  The 'zero' detector carries the runs of tone
+        from block to block and gives the same result as reading the whole
+        file.  'goertzel' and 'rms' decode with a MorseListener whose tone and
+        noise levels follow the signal, rather than being measured over the
+        whole recording, and its timing is fitted to the start of the
+        recording like decode
+        """
+        block_size = self.block_size if self.block_size is not None else 65536
+        soundfile = get_soundfile()
+        info = soundfile.info(file_name)
+        sample_rate = info.samplerate
+        blocks = soundfile.blocks(file_name, blocksize = block_size, dtype = 'int16')
+        if(self.detector == "zero"):
+            tables = self.iter_zero_crossing(self.iter_segments(blocks, sample_rate), sample_rate)
+            morse_code, timing = self.segments_to_morse(tables)
+        else:
+            # the listener is built on the decoder so it is imported when needed
+            from .listen import MorseListener
+            listener = MorseListener(sample_rate, fit = True, audio_decoder = self)
+            listener.morse_code = []
+            for block in blocks:
+                listener.feed(block)
+            listener.flush()
+            # like decode the silence after the last tone is left out
+            morse_code = "".join(listener.morse_code).rstrip(" ")
+            if(morse_code == ""):
+                raise ValueError("No tones found in the audio")
+            timing = listener.timing
+        return self.decode_result(file_name, morse_code, info.frames, sample_rate, timing)
+
+    def segments_to_morse(self, tables):
+        """
+        Convert a stream of SegmentTables to morse code.  The tables are kept
+        until the first FIT_ELEMENTS tones and gaps have arrived to fit the
+        TimingModel to, after that each table is converted as it arrives.
+        Returns the morse code and the TimingModel
+        """
+        morse_code = []
+        process_list = SegmentTable()
+        timing = None
+        for table in tables:
+            if(timing is not None):
+                morse_code.append(self.timing_to_morse(table, timing))
+                continue
+            if(len(process_list) == 0):
+                table = table.without_leading_off()
+            process_list.extend(table)
+            tones = sum(process_list.states)
+            if(min(tones, len(process_list) - tones) >= TimingModel.FIT_ELEMENTS):
+                timing = self.fit_timing(process_list)
+                morse_code.append(self.timing_to_morse(process_list, timing))
+        if(timing is None):
+            timing = self.fit_timing(process_list)
+            morse_code.append(self.timing_to_morse(process_list, timing))
+        return "".join(morse_code), timing
+
+    def fit_timing(self, process_list):
+        """ Get a TimingModel fitted to a SegmentTable with a speed in get_unit_range"""
+        return TimingModel.fit(process_list.get_durations(True),
+                               process_list.get_durations(False),
+                               *self.get_unit_range(), self.profile)
+
+    def get_unit_range(self):
+        """
+        Get the shortest and longest dot looked for when decoding, for every
+        speed a TimingProfile can have (MIN_WPM to MAX_WPM)
+        """
+        fastest = max(TimingProfile.MAX_WPM, self.profile.wpm)
+        slowest = min(TimingProfile.MIN_WPM, self.profile.wpm)
+        return TimingProfile.MIN / (TimingProfile.PARIS * fastest), TimingProfile.MIN / (TimingProfile.PARIS * slowest)
+
+    def decode_result(self, file_name, morse_code, number_samples, sample_rate, timing):
+        """ Get the dictionary decode returns"""
+        morse_code = self.codec.from_standard(morse_code)
+        return {
+            "file": file_name,
+            "morse_code": morse_code,
+            "text": self.codec.decode(morse_code),
+            "duration": number_samples / sample_rate,
+            "sample_rate": sample_rate,
+            "timing": [math.exp(x) for x in timing.tones],
+            "spacing": [math.exp(x) for x in timing.gaps],
+            "dot": timing.unit,
+            "wpm": timing.average_wpm,
+            "wpm_range": [TimingProfile.MIN / (TimingProfile.PARIS * timing.longest),
+                          TimingProfile.MIN / (TimingProfile.PARIS * timing.shortest)]
+        }
+
+    def get_envelope(self, audio_samples, sample_rate):
+        """
+        Measure how much tone there is in the audio data over a window of
+        DETECTOR_WINDOW seconds every DETECTOR_HOP seconds.  The 'goertzel'
+        detector measures the energy at self.tone (the single frequency bin the
+        Goertzel algorithm computes) and the 'rms' detector the energy at any
+        frequency.  Each window is computed from running sums so the whole
+        envelope is found with array operations.  Returns the envelope and the
+        number of samples between its values
+        """
+        if(numpy is None):
+            raise ImportError("numpy is needed for the " + self.detector + " detector")
+        audio = numpy.asarray(audio_samples, dtype=numpy.float64)
+        window = max(1, int(sample_rate * self.DETECTOR_WINDOW))
+        hop = max(1, int(sample_rate * self.DETECTOR_HOP))
+        ends = numpy.arange(window, len(audio) + 1, hop)
+        if(self.detector == "goertzel"):
+            phase = numpy.arange(len(audio)) * (2 * math.pi * self.tone / sample_rate)
+            real = self.window_sums(audio * numpy.cos(phase), ends, window)
+            imag = self.window_sums(audio * numpy.sin(phase), ends, window)
+            envelope = numpy.hypot(real, imag)
+        else:
+            envelope = numpy.sqrt(self.window_sums(audio * audio, ends, window) / window)
+        return envelope, hop
+
+    def get_envelope_samples(self, audio_samples, sample_rate):
+        """
+        Get the same table of 'on' and 'off' segments as get_samples
+        but found from the envelope of the tone, so it works with noisy
+        recordings and does not need fix_zero_crossing
+        """
+        envelope, hop = self.get_envelope(audio_samples, sample_rate)
+        window = max(1, int(sample_rate * self.DETECTOR_WINDOW))
+        keying = self.get_keying(envelope, window // (2 * hop), int(sample_rate * self.PEAK_LENGTH / hop))
+        # close the last run of tone at the end of the audio
+        keying = numpy.append(keying, False)
+        states, starts, stops, durations = self.get_segments(keying, sample_rate / hop)
+        # every envelope value stands for hop samples so a run lasts its whole
+        # length rather than from its first to its last value
+        durations = durations + hop / sample_rate
+        # envelope value k is centred on sample k * hop + window / 2
+        starts = starts * hop + window // 2
+        stops = (stops + 1) * hop + window // 2 - 1
+        return SegmentTable.from_arrays(states, starts, stops, durations)
+
+    @classmethod
+    def fix_zero_crossing(cls, sample_list, sample_rate):
+        """
+        Walk through the sample list and find duration of a tone or absence of tone
+        Adjust the list by taking into account zero crossing points of a single(tone)
+        """
+        process_list = SegmentTable()
+        for table in cls.iter_zero_crossing([sample_list], sample_rate):
+            process_list.extend(table)
+        return process_list
+
+    @classmethod
+    def iter_zero_crossing(cls, tables, sample_rate):
+        """
+        Generator version of fix_zero_crossing for a stream of SegmentTables,
+        such as the ones from iter_segments, yields a fixed table for each.
+        The state is carried from one table to the next so the tables can be
+        any size
+        """
+        state = 0
+        sample_start = 0
+        previous = None
+        dropped = None
+        for sample_list in tables:
+            process_list = SegmentTable()
+            for segment in zip(sample_list.states, sample_list.starts, sample_list.stops, sample_list.durations):
+                on, start, stop, duration = segment
+                dropped = None
+                if(duration == 0.0 and state == 0):
+                    state = 1
+                    sample_start = start
+                elif(duration > 0.01  and state != 1):
+                    process_list.append(*segment)
+                elif(not on and state == 1 and duration > 0.002):
+                    sample_stop = previous[1]
+                    duration = cls.get_duration(sample_start, sample_stop, sample_rate)
+                    process_list.append(True, sample_start, sample_stop, duration)
+                    process_list.append(*segment)
+                    state = 0
+                else:
+                    # a tone still running at the very end is closed there
+                    dropped = (on if previous is None else previous[0], stop)
+                previous = (on, stop)
+            yield process_list
+        if(dropped is not None and not dropped[0]):
+            sample_stop = dropped[1]
+            duration = cls.get_duration(sample_start, sample_stop, sample_rate)
+            yield SegmentTable([True], [sample_start], [sample_stop], [duration])
+
+    @classmethod
+    def get_samples(cls, audio_samples, sample_rate):
+        """ 
+        Walk through the audio data and convert it to a SegmentTable that can be process
+        For each tone find its duration by finding the number of sample for the tone
+        and using it find duration and also categories each input as 'on' or 'off'
+        based on rather it is a tone or absent of a tone
+        """
+        if(numpy is not None):
+            return SegmentTable.from_arrays(*cls.get_segments(audio_samples, sample_rate))
+        state = 0
+        sample_list = SegmentTable()
+        sample_start = 0
+        sample_stop = 0
+        for x in range(len(audio_samples)):
+            if(audio_samples[x] != float(0)):
+                if(state == 0):
+                    sample_start = x
+                    state = 1
+                elif(state == 2):
+                    sample_stop = x - 1
+                    duration = cls.get_duration(sample_start, sample_stop, sample_rate)
+                    sample_list.append(False, sample_start, sample_stop, duration)
+                    sample_start = x
+                    state = 1
+            elif(audio_samples[x] == 0):
+                if(state == 0):
+                    sample_start = x
+                    state = 2
+                elif(state == 1):
+                    sample_stop = x - 1
+                    duration = cls.get_duration(sample_start, sample_stop, sample_rate)
+                    sample_list.append(True, sample_start, sample_stop, duration)
+                    sample_start = x
+                    state = 2
+
+        return sample_list
+
+    @staticmethod
+    def get_segments(audio_samples, sample_rate):
+        """
+        Find the runs of tone and absence of tone in the audio data using numpy
+        array operations instead of walking it one sample at a time.  Returns
+        the same segments as get_samples as four parallel arrays: the state
+        (True for 'on'), the start and stop sample and the duration of each run
+        """
+        tone = numpy.asarray(audio_samples) != 0
+        # index of the first sample of every run after the first one
+        boundaries = numpy.flatnonzero(tone[1:] != tone[:-1]) + 1
+        # like get_samples the last run is never closed so it is left out,
+        # which leaves nothing when there is only one run (or no audio)
+        if(len(boundaries) == 0):
+            return numpy.zeros(0, dtype=bool), boundaries, boundaries, numpy.zeros(0)
+        starts = numpy.concatenate((numpy.zeros(1, dtype=boundaries.dtype), boundaries[:-1]))
+        stops = boundaries - 1
+        states = tone[starts]
+        durations = (stops - starts) / sample_rate
+        return states, starts, stops, durations
+
+    @staticmethod
+    def iter_segments(blocks, sample_rate):
+        """
+        Generator version of get_segments for audio data read a block at a
+        time (like soundfile.blocks), yields a SegmentTable of the runs that
+        finish in each block.  The run still going at the end of a block is
+        carried on into the next one, and like get_samples the last run is
+        never closed.  Without numpy the blocks are walked a sample at a time
+        """
+        if(numpy is None):
+            yield from AudioDecoder.iter_samples(blocks, sample_rate)
+            return
+        offset = 0
+        run_start = 0
+        run_state = None
+        last_tone = False
+        for block in blocks:
+            tone = numpy.asarray(block) != 0
+            if(len(tone) == 0):
+                continue
+            if(run_state is None):
+                run_state = last_tone = bool(tone[0])
+            before = numpy.concatenate(([last_tone], tone[:-1]))
+            boundaries = numpy.flatnonzero(tone != before) + offset
+            count = len(boundaries)
+            if(count > 0):
+                starts = numpy.concatenate(([run_start], boundaries[:-1]))
+                stops = boundaries - 1
+                # runs of tone and no tone take turns
+                states = (numpy.arange(count) % 2 == 1) != run_state
+                durations = (stops - starts) / sample_rate
+                yield SegmentTable.from_arrays(states, starts, stops, durations)
+                run_start = int(boundaries[-1])
+                run_state = run_state != (count % 2 == 1)
+            last_tone = bool(tone[-1])
+            offset += len(tone)
+
+    @classmethod
+    def iter_samples(cls, blocks, sample_rate):
+        """ iter_segments for when numpy is not installed, like get_samples for blocks"""
+        offset = 0
+        run_start = 0
+        run_state = None
+        for block in blocks:
+            sample_list = SegmentTable()
+            for x, sample in enumerate(block, offset):
+                tone = bool(sample != 0)
+                if(run_state is None):
+                    run_state = tone
+                elif(tone != run_state):
+                    duration = cls.get_duration(run_start, x - 1, sample_rate)
+                    sample_list.append(run_state, run_start, x - 1, duration)
+                    run_start = x
+                    run_state = tone
+            offset += len(block)
+            if(len(sample_list)):
+                yield sample_list
+
+    @staticmethod
+    def get_duration(sample_start, sample_stop, sample_rate):
+        """ Get the duration of a tone sample"""
+        number_samples = sample_stop - sample_start
+        duration = number_samples/sample_rate
+        return duration
+
+    @staticmethod
+    def timing_to_morse(process_list, timing):
+        """
+        loop through the process list and convert it to morse code, telling
+        the elements apart with a TimingModel which follows changes of speed
+        """
+        morse_code = []
+        for state, duration in zip(process_list.states, process_list.durations):
+            if(state):
+                morse_code.append(timing.tone(duration))
+            else:
+                morse_code.append(" " * timing.gap(duration))
+        return "".join(morse_code)
+
+    @staticmethod
+    def window_sums(values, ends, window):
+        """ Sum of values over the window samples before each index in ends"""
+        sums = numpy.concatenate(([0.0], numpy.cumsum(values)))
+        return sums[ends] - sums[ends - window]
+
+    @staticmethod
+    def get_keying(envelope, min_length = 1, peak_length = 1):
+        """
+        Decide if the tone is on or off for each value of the envelope.  The
+        tone turns on above 60% and off below 40% of the way from the noise
+        floor to the tone level so noise around a single threshold does not
+        toggle it (hysteresis).  The tone level is the loudest average over
+        peak_length values, so a few short tones in a long recording are
+        found, and the noise floor the median of the envelope below halfway
+        to it.  Nothing is keyed unless the tone is MIN_SNR times the noise.
+        Runs shorter than min_length values are treated as glitches and
+        merged into the runs around them
+        """
+        if(len(envelope) == 0):
+            return numpy.zeros(0, dtype=bool)
+        peak_length = max(1, min(peak_length, len(envelope)))
+        peak = numpy.max(AudioDecoder.window_sums(envelope, numpy.arange(peak_length, len(envelope) + 1),
+                                                  peak_length)) / peak_length
+        quiet = envelope[envelope < (numpy.percentile(envelope, 5) + peak) / 2]
+        floor = numpy.median(quiet) if len(quiet) else peak
+        if(peak <= floor * AudioDecoder.MIN_SNR):
+            return numpy.zeros(len(envelope), dtype=bool)
+        keying = AudioDecoder.hysteresis(envelope, floor, peak)
+        starts = numpy.concatenate(([0], numpy.flatnonzero(keying[1:] != keying[:-1]) + 1))
+        lengths = numpy.diff(numpy.append(starts, len(keying)))
+        short = lengths < min_length
+        return keying ^ numpy.repeat(short, lengths)
+
+    @staticmethod
+    def hysteresis(envelope, floor, peak, keyed = False):
+        """
+        Get if the tone is on for each value of the envelope, turning on above
+        60% and off below 40% of the way from floor to peak.  keyed is if the
+        tone was on before the first value
+        """
+        on_level = floor + 0.6 * (peak - floor)
+        off_level = floor + 0.4 * (peak - floor)
+        mark = numpy.full(len(envelope) + 1, -1, dtype=numpy.int8)
+        mark[0] = keyed
+        mark[1:][envelope > on_level] = 1
+        mark[1:][envelope < off_level] = 0
+        # between the two levels keep the last state by carrying forward the
+        # index of the last value that was above or below them
+        last = numpy.where(mark >= 0, numpy.arange(len(mark)), 0)
+        numpy.maximum.accumulate(last, out=last)
+        return mark[last][1:] == 1
@@ -0,0 +1,17 @@
+class FrozenSlots:
+
+    __slots__ = ()
+
+    def _set(self, *values):
+        """ Set each slot in order, which is the only way they can be set"""
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(type(self).__name__ + " can not be changed, make a new one")
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        self._set(*state)
@@ -0,0 +1,280 @@
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .audio import AudioFormat, get_audio
+from .decode import AudioDecoder
+from .timing import TimingModel
+
+class MorseListener:
+
+    LEVEL_DECAY = 5.0
+    LEVEL_HISTORY = 2.0
+    MIN_SNR = AudioDecoder.MIN_SNR
+    WARM_UP = 0.25
+    QUIET_LENGTH = 0.01
+
+    def __init__(self, sample_rate = 44100, wpm = 10, hz = 800, detector = "goertzel", fit = False,
+                 audio_decoder = None):
+        """
+        Decode morse code from 16 bit mono audio as it arrives, for example
+        from a microphone or raw PCM piped on stdin.  Chunks of any size can be
+        fed in and the on/off state is carried from one chunk to the next, so
+        memory does not grow and letters come out about two dots after they
+        end.  The tone and noise levels and the dot length (starting from wpm)
+        follow the signal as it changes.  Nothing is decoded until WARM_UP
+        seconds of audio have arrived to measure the levels from, or longer
+        (up to LEVEL_HISTORY seconds) if the stream starts in a tone and there
+        is no quiet to measure the noise from yet.  If fit is
+        True nothing is output until the first TimingModel.FIT_ELEMENTS tones
+        and gaps have arrived to fit the timing to, which copes with a real
+        speed far from wpm, and the levels are measured from the first
+        LEVEL_HISTORY seconds (for decoding a file rather than live audio).
+        The profile, tone, detector and codec can be given as an AudioDecoder
+        instead of wpm, hz and detector
+
+        Parameters:
+            audio_decoder(AudioDecoder): measures the envelope at its tone
+            decoder(MorseDecoder): turns the symbols into text
+            timing(TimingModel): tells the elements apart, following the speed
+            samples(array): is audio not yet measured
+            warming(bool): is True until the levels are first measured
+            history(array): is the last LEVEL_HISTORY seconds of the envelope
+            peak, floor(float): are the tone and noise levels of the envelope
+            raw_keyed, raw_run: is the last run of tone or silence, which may
+                carry on into the next chunk
+            keyed, run: is the run of tone or silence after glitches (a third
+                of a dot or shorter) are merged away
+            spaces(int): is the spaces already output for the current silence
+            morse_code(list): is the morse code decoded so far if it is a list,
+                None (the default) not to keep it
+            pending(list): is the runs kept to fit the timing to, None once
+                fitted or if not fitting
+        """
+        if(audio_decoder is None):
+            audio_decoder = AudioDecoder(wpm, hz, detector)
+        if(audio_decoder.detector not in ("goertzel", "rms")):
+            raise ValueError("Detector must be goertzel or rms")
+        if(numpy is None):
+            raise ImportError("numpy is needed for the " + audio_decoder.detector + " detector")
+        self.audio_decoder = audio_decoder
+        self.decoder = audio_decoder.codec.get_decoder()
+        self.sample_rate = sample_rate
+        self.detector = audio_decoder.detector
+        self.timing = TimingModel.from_profile(audio_decoder.profile, *audio_decoder.get_unit_range())
+        self.hop = max(1, int(sample_rate * AudioDecoder.DETECTOR_HOP))
+        window = max(1, int(sample_rate * AudioDecoder.DETECTOR_WINDOW))
+        self.min_length = max(1, window // (2 * self.hop))
+        self.samples = numpy.zeros(0)
+        self.extra = b""
+        self.warming = True
+        self.history = numpy.zeros(0)
+        self.peak = 0.0
+        self.floor = 0.0
+        self.raw_keyed = False
+        self.raw_run = 0
+        self.keyed = False
+        self.run = 0
+        self.spaces = 0
+        self.started = False
+        self.morse_code = None
+        self.pending = [] if fit else None
+        self.warm_up = self.LEVEL_HISTORY if fit else self.WARM_UP
+
+    def feed(self, samples):
+        """
+        Decode a chunk of audio, either an array of samples or bytes of 16 bit
+        little endian PCM.  Returns the text decoded so far
+        """
+        if(isinstance(samples, (bytes, bytearray, memoryview))):
+            data = self.extra + bytes(samples)
+            usable = len(data) - len(data) % 2
+            self.extra = data[usable:]
+            samples = numpy.frombuffer(data[:usable], dtype='<i2')
+        audio = numpy.concatenate((self.samples, numpy.asarray(samples, dtype=numpy.float64)))
+        if(self.warming and len(audio) < self.warm_up * self.sample_rate):
+            self.samples = audio
+            return ""
+        envelope, hop = self.audio_decoder.get_envelope(audio, self.sample_rate)
+        if(len(envelope) == 0):
+            self.samples = audio
+            return ""
+        if(self.warming and len(audio) < self.LEVEL_HISTORY * self.sample_rate
+           and numpy.percentile(envelope, 95) <= self.get_quietest(envelope) * self.MIN_SNR):
+            # all tone (or all quiet) so far, wait for both to set the levels from
+            self.samples = audio
+            return ""
+        self.warming = False
+        self.samples = audio[len(envelope) * hop:]
+        self.update_levels(envelope)
+        if(self.peak > self.floor * self.MIN_SNR):
+            keying = AudioDecoder.hysteresis(envelope, self.floor, self.peak, self.raw_keyed)
+        else:
+            keying = numpy.zeros(len(envelope), dtype=bool)
+        text = []
+        changes = numpy.flatnonzero(keying != numpy.append(self.raw_keyed, keying[:-1]))
+        last = 0
+        for index in changes.tolist():
+            text.append(self.add_run(self.raw_keyed, self.raw_run + index - last))
+            self.raw_keyed = not self.raw_keyed
+            self.raw_run = 0
+            last = index
+        self.raw_run += len(keying) - last
+        if(not self.keyed and (not self.raw_keyed or self.is_glitch(self.raw_run))):
+            # output the spaces for the silence so far without waiting for it to end
+            text.append(self.add_spaces(self.run + self.raw_run))
+        return "".join(text)
+
+    def flush(self):
+        """
+        Finish the audio received so far, returns the rest of the text
+        without the spaces after the last letter
+        """
+        text = ""
+        if(self.warming):
+            # decode audio too short to finish warming up
+            self.warming = False
+            self.warm_up = 0
+            text = self.feed(b"")
+        text += self.add_run(self.raw_keyed, self.raw_run) + self.end_run()
+        if(self.pending is not None):
+            text += self.fit_pending()
+        self.raw_keyed = self.keyed = False
+        self.raw_run = self.run = 0
+        return (text + self.decoder.flush()).rstrip(" ")
+
+    def update_levels(self, envelope):
+        """
+        Follow the tone and noise levels over the last LEVEL_HISTORY seconds
+        of the envelope.  The tone level jumps straight to a louder tone and
+        otherwise relaxes over LEVEL_DECAY seconds so it is remembered through
+        the gaps, and the noise level the same way the other way up.  The tone
+        is only listened for once it is MIN_SNR times the noise
+        """
+        size = int(self.LEVEL_HISTORY * self.sample_rate / self.hop)
+        first = len(self.history) == 0
+        self.history = numpy.concatenate((self.history, envelope))[-size:]
+        low, high = numpy.percentile(self.history, [10, 95])
+        if(len(self.history) < size):
+            # a short history can be almost all tone if the stream started in
+            # one, so the noise is measured from its quietest part
+            low = min(low, self.get_quietest(self.history))
+        decay = math.exp(-len(envelope) * self.hop / self.sample_rate / self.LEVEL_DECAY)
+        self.peak = max(high, self.peak * decay)
+        # and the noise level jumps straight to quieter noise and otherwise
+        # rises as slowly, so it stays down through a tone longer than the
+        # history at slow speeds
+        self.floor = low if first else min(low, self.floor / decay)
+
+    def get_quietest(self, envelope):
+        """ Get the lowest average of the envelope over QUIET_LENGTH seconds"""
+        length = max(1, int(self.QUIET_LENGTH * self.sample_rate / self.hop))
+        if(len(envelope) <= length):
+            return float(numpy.mean(envelope))
+        sums = numpy.concatenate(([0.0], numpy.cumsum(envelope)))
+        return float(numpy.min(sums[length:] - sums[:-length])) / length
+
+    def add_run(self, keyed, run):
+        """ Add a finished run of tone or silence, returns any text it finishes"""
+        if(run == 0):
+            return ""
+        if(keyed == self.keyed or self.is_glitch(run)):
+            self.run += run
+            return ""
+        text = self.end_run()
+        self.keyed = keyed
+        self.run = run
+        return text
+
+    def is_glitch(self, run):
+        """ True if a run of run values is too short to be part of the morse code"""
+        # until the timing is fitted only runs too short for the fastest dot are glitches
+        unit = self.timing.unit if self.pending is None else self.timing.fastest
+        return run < self.min_length or run * self.hop / self.sample_rate < unit / 3
+
+    def end_run(self):
+        """ Turn the current run into morse code, returns any text it finishes"""
+        if(self.pending is not None):
+            return self.add_pending()
+        duration = self.run * self.hop / self.sample_rate
+        if(self.keyed and self.run > 0):
+            self.started = True
+            self.spaces = 0
+            return self.emit(self.timing.tone(duration))
+        return self.add_spaces(self.run, True)
+
+    def add_spaces(self, run, finished = False):
+        """
+        Output the spaces for a silence of run values, nothing for the gap
+        between elements, one for the gap between letters and two for the gap
+        between words.  Only a finished silence is learnt from
+        """
+        if(not self.started or self.pending is not None):
+            return ""
+        spaces = self.timing.gap(run * self.hop / self.sample_rate, finished and run > 0)
+        text = self.emit(" " * (spaces - self.spaces))
+        self.spaces = max(spaces, self.spaces)
+        return text
+
+    def add_pending(self):
+        """ Keep the current run to fit the timing to, returns the text once there are enough"""
+        if(self.run > 0 and (self.keyed or self.started)):
+            self.started = True
+            self.pending.append((self.keyed, self.run))
+        tones = sum(keyed for keyed, run in self.pending)
+        if(min(tones, len(self.pending) - tones) < TimingModel.FIT_ELEMENTS):
+            return ""
+        return self.fit_pending()
+
+    def fit_pending(self):
+        """ Fit the timing to the kept runs and decode them, returns their text"""
+        pending = self.pending
+        self.pending = None
+        scale = self.hop / self.sample_rate
+        tones = [run * scale for keyed, run in pending if keyed]
+        if(not tones):
+            return ""
+        gaps = [run * scale for keyed, run in pending if not keyed]
+        self.timing = TimingModel.fit(tones, gaps, self.timing.fastest, self.timing.slowest,
+                                      self.audio_decoder.profile)
+        text = []
+        for keyed, run in pending:
+            if(keyed):
+                self.spaces = 0
+                text.append(self.emit(self.timing.tone(run * scale)))
+            else:
+                text.append(self.add_spaces(run, True))
+        return "".join(text)
+
+    def emit(self, symbols):
+        """ Decode morse code symbols, keeping them if morse_code is a list"""
+        if(self.morse_code is not None):
+            self.morse_code.append(symbols)
+        return self.decoder.feed(self.audio_decoder.codec.from_standard(symbols))
+
+    def listen_file(self, file, chunk_size = 4096):
+        """ Generator that decodes raw 16 bit PCM read from a binary file, yields text"""
+        while(True):
+            data = file.read(chunk_size * 2)
+            if(not data):
+                break
+            text = self.feed(data)
+            if(text):
+                yield text
+        yield self.flush()
+
+    def listen_microphone(self, chunk_size = 1024):
+        """ Generator that decodes audio from the default input device, yields text"""
+        stream = get_audio().open(format = AudioFormat(self.sample_rate).pyaudio_format, channels = 1,
+                                  rate = self.sample_rate, input = True, frames_per_buffer = chunk_size)
+        try:
+            while(True):
+                text = self.feed(stream.read(chunk_size))
+                if(text):
+                    yield text
+        finally:
+            stream.stop_stream()
+            stream.close()
@@ -0,0 +1,587 @@
+import asyncio
+import functools
+
+from .audio import AudioFormat, MorsePlayer, get_audio, get_soundfile
+from .codec import TextCodec
+from .decode import AudioDecoder
+from .render import AudioRenderer
+from .timing import TimingProfile
+
+class MorseCode:
+
+    FORMAT = 8 # pyaudio.paInt16
+    CHANNELS = 1
+    RATE = AudioFormat.RATE
+    PARIS = TimingProfile.PARIS
+    MIN = TimingProfile.MIN
+    ELEMENT_CACHE_SIZE = AudioRenderer.ELEMENT_CACHE_SIZE
+    DETECTORS = AudioDecoder.DETECTORS
+    DETECTOR_WINDOW = AudioDecoder.DETECTOR_WINDOW
+    DETECTOR_HOP = AudioDecoder.DETECTOR_HOP
+    PEAK_LENGTH = AudioDecoder.PEAK_LENGTH
+
+    morse = {
+        "a": ".-",
+        "b": "-...",
+        "c": "-.-.",
+        "d": "-..",
+        "e": ".",
+        "f": "..-.",
+        "g": "--.",
+        "h": "....",
+        "i": "..",
+        "j": ".---",
+        "k": "-.-",
+        "l": ".-..",
+        "m": "--",
+        "n": "-.",
+        "o": "---",
+        "p": ".--.",
+        "q": "--.-",
+        "r": ".-.",
+        "s": "...",
+        "t": "-",
+        "u": "..-",
+        "v": "...-",
+        "w": ".--",
+        "x": "-..-",
+        "y": "-.--",
+        "z": "--..",
+        "1": ".----",
+        "2": "..---",
+        "3": "...--",
+        "4": "....-",
+        "5": ".....",
+        "6": "-....",
+        "7": "--...",
+        "8": "---..",
+        "9": "----.",
+        "0": "-----"
+    }
+
+    def __init__(self, textstr, wpm = 10, hz = 800, audio_format = None, rise_time = 0.0, codec = None):
+        """
+        Constructor for the morsecode class which generates morse code text
+        and audio from a string text.  Can also translate morse code audio(wav)
+        files back to string text
+        
+        Parameters:
+            profile(TimingProfile): is the timing for the morse code, wpm can
+                be a TimingProfile or the words per minute of a standard one
+            time_period(float): is the length of a dot of the profile
+            tone(float): is the frequency of the tone used by morse code
+            morse_text(str): is the string text that will be translated to morsecode
+            morse_code(str): is the morse code for the string text
+            audio(PyAudio): is the shared PyAudio instance (see get_audio),
+                opened the first time audio is played
+            player(MorsePlayer): is the morse code being played by start_morse
+            audio_format(AudioFormat): is how the audio is rendered, 16 bit
+                samples at RATE by default
+            rise_time(float): is the seconds each tone takes to rise and fall
+                (see set_rise_time), 0 for the tone to be switched on and off
+            codec(TextCodec): converts text to and from morse code, the one
+                from get_text_codec by default (which raises KeyError for a
+                character with no morse code)
+        """
+        if(isinstance(wpm, TimingProfile)):
+            self.profile = wpm
+        else:
+            self.profile = TimingProfile(wpm)
+        self.tone = self.set_tone(hz)
+        self.rise_time = self.set_rise_time(rise_time)
+        self.audio_format = audio_format if audio_format is not None else AudioFormat(self.RATE)
+        self.player = None
+        self.codec = codec if codec is not None else self.get_text_codec()
+        self.morse_text = textstr
+        self.morse_code = self.to_morse(self.morse_text)
+
+    @property
+    def time_period(self):
+        """ Length of a dot in seconds, setting it keeps the rest of the profile"""
+        return self.profile.unit
+
+    @time_period.setter
+    def time_period(self, time_period):
+        self.profile = self.profile.with_unit(time_period)
+
+    @property
+    def audio(self):
+        """ PyAudio is only opened when audio is played, not for saving files"""
+        return get_audio()
+
+    def set_tone(self, hz):
+        return AudioRenderer.check_tone(hz)
+
+    def set_time_period(self, wpm):
+        """ 
+        Get the time_period used for timing of morsecode based on
+        wpm (words per minute)
+        """
+        if(wpm < TimingProfile.MIN_WPM or wpm > TimingProfile.MAX_WPM):
+            raise ValueError("WPM must be between {0} andd {1}".format(TimingProfile.MIN_WPM, TimingProfile.MAX_WPM))
+        time_period = self.MIN/(self.PARIS * wpm)
+        return time_period
+
+    def set_rise_time(self, rise_time):
+        """ Get the rise_time used to shape the tones (see AudioRenderer.check_rise_time)"""
+        return AudioRenderer.check_rise_time(rise_time, self.time_period)
+
+################# test to morse functions #################
+
+    def to_string(self, mcode):
+        """ convert morsecode to text"""
+        morse_text = self.codec.decode(mcode)
+        self.morse_text = morse_text
+        self.morse_code = mcode
+        return morse_text
+
+    @classmethod
+    def morse_to_text(cls, mcode):
+        """
+        Convert morsecode to text without changing the state of the class (see
+        TextCodec.decode).  Use get_decoder to decode morse code that arrives
+        a piece at a time
+        """
+        return cls.get_text_codec().decode(mcode)
+
+    @classmethod
+    def decode_many(cls, mcodes):
+        """ Convert each morsecode in an iterable to text, returns a list of text"""
+        return cls.get_text_codec().decode_many(mcodes)
+
+    @classmethod
+    def get_text_codec(cls, alphabets = TextCodec.DEFAULT_ALPHABETS, unknown = "raise", replacement = "?", dot = "."):
+        """
+        Get the TextCodec for the morse table with a sequence of extra
+        alphabets (see TextCodec), built once per class and setting and shared
+        """
+        return cls.build_text_codec(tuple(alphabets), unknown, replacement, dot)
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def build_text_codec(cls, alphabets, unknown, replacement, dot):
+        """ Build the TextCodec for get_text_codec, alphabets must be a tuple"""
+        return TextCodec(cls.morse, alphabets, unknown, replacement, dot)
+
+    @classmethod
+    def get_reverse_morse(cls):
+        """ Get the morse table reversed (morse code to letter), built once per class"""
+        return cls.get_text_codec().reverse_table
+
+    @classmethod
+    def get_morse_tree(cls):
+        """ Get the morse table as a MorseTree, built once per class"""
+        return cls.get_text_codec().tree
+
+    def get_decoder(self):
+        """ Get a MorseDecoder to decode morse code as it is received"""
+        return self.codec.get_decoder()
+
+    def get_word(self, mcode):
+        """ Convert a word in morse to regular text"""
+        return self.codec.get_letter(mcode)
+
+    @staticmethod
+    def get_letters(mcode):
+        """ Get a list of morsecode from a string of mcode split by space"""
+        letter_list = mcode.split(" ")
+        return letter_list
+
+    def get_words(self, mcode):
+        """ Get a list of words from a morsecode from a string split by double spaces"""
+        word_list = mcode.split("  ")
+        word_list = self.strip_word(word_list)
+        return word_list
+
+    @staticmethod
+    def strip_word(word):
+        """ Split whitespace from a word """
+        for x in range(len(word)):
+            word[x] = word[x].strip()
+        return word
+
+    def to_morse(self, mcode):
+        """ Convert text to morse code """
+        mcode = mcode.lower()
+        morse_text = self.codec.encode(mcode)
+        self.morse_text = mcode
+        self.morse_code = morse_text
+        return morse_text
+
+    @classmethod
+    def get_encode_table(cls):
+        """
+        Get the morse table with a space added after each code and an entry for
+        the space between words, built once per class (see TextCodec)
+        """
+        return cls.get_text_codec().encode_table
+
+    @classmethod
+    def text_to_morse(cls, text):
+        """
+        Convert text to morse code without changing the state of the class.
+        Raises KeyError for a character that has no morse code like to_morse
+        """
+        return cls.get_text_codec().encode(text)
+
+    @classmethod
+    def encode_many(cls, texts):
+        """ Convert each text in an iterable to morse code, returns a list of morse code"""
+        return cls.get_text_codec().encode_many(texts)
+
+################### Process audio data ############################
+
+    def get_timing(self, process_list, type_timing):
+        """ 
+        Used to get a sort set for different duration needed to conver to 
+        morse code.  type_timing is 'on' for tones and 'off' for gaps
+        """
+        timing = set(process_list.get_durations(type_timing == 'on'))
+        return sorted(timing)
+
+    @staticmethod
+    def fix_zero_crossing(sample_list, sample_rate):
+        """ Fix the runs of a tone to its zero crossing points (see AudioDecoder.fix_zero_crossing)"""
+        return AudioDecoder.fix_zero_crossing(sample_list, sample_rate)
+
+    @staticmethod
+    def iter_zero_crossing(tables, sample_rate):
+        """ Generator version of fix_zero_crossing (see AudioDecoder.iter_zero_crossing)"""
+        return AudioDecoder.iter_zero_crossing(tables, sample_rate)
+
+    @staticmethod
+    def get_samples(audio_samples, sample_rate):
+        """ Convert the audio data to a SegmentTable of its runs (see AudioDecoder.get_samples)"""
+        return AudioDecoder.get_samples(audio_samples, sample_rate)
+
+    @staticmethod
+    def get_segments(audio_samples, sample_rate):
+        """ Find the runs of tone in the audio data using numpy (see AudioDecoder.get_segments)"""
+        return AudioDecoder.get_segments(audio_samples, sample_rate)
+
+    @staticmethod
+    def iter_segments(blocks, sample_rate):
+        """ Generator version of get_segments for blocks of audio (see AudioDecoder.iter_segments)"""
+        return AudioDecoder.iter_segments(blocks, sample_rate)
+
+    @staticmethod
+    def iter_samples(blocks, sample_rate):
+        """ iter_segments for when numpy is not installed (see AudioDecoder.iter_samples)"""
+        return AudioDecoder.iter_samples(blocks, sample_rate)
+
+    @staticmethod
+    def get_duration(sample_start, sample_stop, sample_rate):
+        """ Get the duration of a tone sample"""
+        return AudioDecoder.get_duration(sample_start, sample_stop, sample_rate)
+
+    @staticmethod
+    def del_leading_off(process_list):
+        """ if the first input of the process list is 'off' delete it"""
+        return process_list.without_leading_off()
+
+    @staticmethod
+    def post_process_timing(timing_val):
+        '''
+        Do some postprocessing on timing of the morsecode due to 
+        timing that is not exact.  Validate two timing values that are
+        close to be the same value
+        '''
+        list1 = []
+        for x in range(len(timing_val)):
+            for y in range(len(timing_val)):
+                z = timing_val[x] / timing_val[y]
+                if(z > 0.9 and z < 1.1):
+                    timing_val[y] = timing_val[x]
+        return timing_val
+
+    @staticmethod
+    def post_process(process_list, timing, spacing, timing1, spacing1):
+        """ 
+        timing might not be exact thus, if two inputs are with 90% (.9 and 1.1)
+        of each other then they are considered the same as far as timing
+        walk through the process list and adjust accordingly
+        """
+        durations = process_list.durations
+        for x in range(len(process_list)):
+            if(process_list.states[x]):
+                for y in range(len(timing)):
+                    if(timing[y] == durations[x]):
+                        durations[x] = timing1[y]
+                        break
+            else:
+                for y in range(len(spacing)):
+                    if(spacing[y] == durations[x]):
+                        durations[x] = spacing1[y]
+        return process_list
+
+    @staticmethod
+    def timing_to_morse(process_list, timing):
+        """ Convert the process list to morse code with a TimingModel (see AudioDecoder.timing_to_morse)"""
+        return AudioDecoder.timing_to_morse(process_list, timing)
+
+    @staticmethod
+    def process_to_morse(process_list, timing, spacing):
+        """ loop through the process list and convert it to morse code"""
+        morse_code = ""
+        for state, duration in zip(process_list.states, process_list.durations):
+            if(state):
+                if(timing[0] == duration):
+                    morse_code +="."
+                else:
+                    morse_code +="-"
+            else:
+                if(spacing[1] == duration):
+                    morse_code += " "
+                elif(spacing[0] == duration):
+                    pass
+                else:
+                    morse_code += "  "
+        return morse_code
+    
+    @staticmethod
+    def window_sums(values, ends, window):
+        """ Sum of values over the window samples before each index in ends (see AudioDecoder.window_sums)"""
+        return AudioDecoder.window_sums(values, ends, window)
+
+    @staticmethod
+    def get_keying(envelope, min_length = 1, peak_length = 1):
+        """ Decide if the tone is on or off for each value of the envelope (see AudioDecoder.get_keying)"""
+        return AudioDecoder.get_keying(envelope, min_length, peak_length)
+
+    @staticmethod
+    def hysteresis(envelope, floor, peak, keyed = False):
+        """ Get if the tone is on for each value of the envelope (see AudioDecoder.hysteresis)"""
+        return AudioDecoder.hysteresis(envelope, floor, peak, keyed)
+
+    def sound_to_morse(self, file_name = None, detector = "zero", block_size = None):
+        """
+        Get the morse code and text from a morse code audio(wav) file.
+        detector is how tone is told apart from silence: 'zero' treats any non
+        zero sample as tone which only works for clean files like the ones made
+        by save_wav, 'goertzel' looks for energy at self.tone and 'rms' for
+        energy at any frequency, both of which cope with noisy recordings.
+        block_size is the number of samples to read at a time for long
+        recordings (see AudioDecoder.decode_blocks), by default the whole file
+        is read
+        """
+        result = self.decode_audio(file_name, detector, block_size)
+        self.morse_text = result["text"]
+        self.morse_code = result["morse_code"]
+        self.teststr = result["text"]
+
+    def decode_audio(self, file_name, detector = "zero", block_size = None):
+        """
+        Decode a morse code audio(wav) file without changing the state of the
+        class (see sound_to_morse for detector and block_size).  Returns a
+        dictionary of the file, its morse code and text, its duration and
+        sample rate, the tone and gap durations found and the dot length and
+        wpm they work out to (see AudioDecoder.decode)
+        """
+        return self.get_audio_decoder(detector, block_size).decode(file_name)
+
+    def get_audio_decoder(self, detector = "zero", block_size = None):
+        """ Get an AudioDecoder for the profile and tone of the class"""
+        return AudioDecoder(self.profile, self.tone, detector, block_size, self.codec)
+
+######################## Create Audio Data ###################
+
+    def data_for_offtime(self, time):
+        """ Get data for offtime for morsecode for audio format"""
+        frame_count = int(self.audio_format.rate * time)
+        return self.silence_samples(frame_count, self.audio_format.sample_width)
+
+    def data_for_freq(self, frequency, time):
+        """
+        get frames for a fixed frequency for a specified time or
+        number of frames, if frame_count is specified, the specified
+        time is ignored
+        """
+        frame_count = int(self.audio_format.rate * time)
+        return self.tone_samples(frequency, frame_count, self.audio_format.rate, self.audio_format.sample_format)
+
+    @staticmethod
+    def silence_samples(frame_count, sample_width = 2):
+        """ Get frame_count samples of silence as bytes (see AudioRenderer.silence_samples)"""
+        return AudioRenderer.silence_samples(frame_count, sample_width)
+
+    @staticmethod
+    def tone_samples(frequency, frame_count, rate = None, sample_format = "int16"):
+        """ Get frame_count samples of a sine wave at frequency as bytes (see AudioRenderer.tone_samples)"""
+        return AudioRenderer.tone_samples(frequency, frame_count, rate, sample_format)
+
+    @staticmethod
+    def get_element_frames(tone, timing, rate = None, sample_format = "int16"):
+        """ Get the cached audio frames for each morse code symbol (see AudioRenderer.get_element_frames)"""
+        return AudioRenderer.get_element_frames(tone, timing, rate, sample_format)
+
+    @staticmethod
+    def get_shaped_elements(tone, timing, rate, sample_format, rise_time):
+        """ Get the cached parts of the shaped frames for each symbol (see AudioRenderer.get_shaped_elements)"""
+        return AudioRenderer.get_shaped_elements(tone, timing, rate, sample_format, rise_time)
+
+    def get_renderer(self):
+        """ Get an AudioRenderer for the profile, tone, AudioFormat and rise time of the class"""
+        return AudioRenderer(self.profile, self.tone, self.audio_format, self.rise_time)
+
+    def iter_morse_frames(self, morse_code, audio_format = None):
+        """
+        Generator that yields the audio frames for morse code one symbol at a
+        time, in audio_format, self.audio_format by default (see
+        AudioRenderer.iter_frames)
+        """
+        return self.get_renderer().iter_frames(self.codec.to_standard(morse_code), audio_format)
+
+    def get_morse_frame(self, morse_code):
+        """ Get the audio frames for morse code as a bytearray"""
+        return self.get_renderer().get_frames(self.codec.to_standard(morse_code))
+
+################## Audio Information #######################
+
+    def sound_info(self, file_path):
+        """ Prints out audio information for an wave file"""
+        print('Open audio file path:', file_path)
+        soundfile = get_soundfile()
+        info = soundfile.info(file_path)
+        sample_rate = info.samplerate
+        number_samples = info.frames
+        # only the start of the file is read so long recordings are not loaded
+        audio_samples, _ = soundfile.read(file_path, frames = 1024, dtype='int16')
+        print('Audio Samples: ', audio_samples)
+        print('Number of Sample', number_samples)
+        print('Sample Rate: ', sample_rate)
+        # duration of the audio file
+        duration = round(number_samples/sample_rate, 2)
+        print('Audio Duration: {0}s'.format(duration))
+
+#################### Play Audio Functions ####################
+
+    def play(self, frequency, time):
+        """
+        play a frequency for a fixed time!
+        """
+        frames = self.data_for_freq(frequency, time)
+        stream = self.audio.open(format = self.audio_format.pyaudio_format, channels = self.CHANNELS,
+                                 rate = self.audio_format.rate, output=True)
+        stream.write(frames)
+        stream.stop_stream()
+        stream.close()
+
+    def play_morse(self, morse_code = None):
+        """ used to play tone that represent the morsecode, returns when it is done"""
+        self.start_morse(morse_code).wait()
+
+    def start_morse(self, morse_code = None):
+        """
+        Start playing the morse code and return straight away.  The whole
+        message including the gaps is played through one stream so the timing
+        does not drift.  Returns the MorsePlayer which can be stopped or
+        waited on, any morse code already playing is stopped first
+        """
+        if(morse_code == None):
+            morse_code = self.morse_code
+        self.stop_morse()
+        self.player = MorsePlayer(self.iter_morse_frames(morse_code), self.audio_format.sample_width)
+        self.player.start(self.audio, self.audio_format.pyaudio_format, self.CHANNELS, self.audio_format.rate)
+        return self.player
+
+    def stop_morse(self):
+        """ Stop the morse code started by start_morse if it is still playing"""
+        if(self.player is not None):
+            self.player.stop()
+            self.player = None
+
+##################### Save Wave File #######################
+
+    def save_wav(self, file_name, morse_code = None):
+        """ Save the recorded data as a WAV file """
+        self.write_wav(file_name, morse_code)
+        print("Save the morse code audo to " + file_name)
+
+    def write_wav(self, file_name, morse_code = None):
+        """
+        Write the audio for the morse code to a WAV file at the sample rate and
+        format of self.audio_format.  Returns the number of frames
+        """
+        audio_format = AudioFormat(self.audio_format.rate, self.audio_format.sample_format, "wav")
+        return self.write_audio(file_name, morse_code, audio_format)
+
+    def save_audio(self, file_name, morse_code = None):
+        """ Save the morse code audio in self.audio_format (see write_audio)"""
+        self.write_audio(file_name, morse_code)
+        print("Save the morse code audo to " + file_name)
+
+    def write_audio(self, file, morse_code = None, audio_format = None):
+        """
+        Write the audio for the morse code to a file name or binary file object
+        in audio_format (self.audio_format by default), with the container
+        taken from the file extension if the format has none (see
+        AudioRenderer.write).  Returns the number of frames
+        """
+        if(morse_code == None):
+            morse_code = self.morse_code
+        return self.get_renderer().write(file, self.codec.to_standard(morse_code), audio_format)
+
+class AsyncMorseCode:
+
+    def __init__(self, wpm = 10, hz = 800, executor = None, audio_format = None, rise_time = 0.0, codec = None):
+        """
+        asyncio front end for MorseCode.  Rendering and decoding audio run in
+        an executor so they do not stall the event loop, and playing waits on
+        the loop instead of sleeping
+
+        Parameters:
+            morse(MorseCode): does the work at the given wpm, tone, AudioFormat,
+                rise time and TextCodec
+            executor(Executor): runs the work, None for the loop's default
+        """
+        self.morse = MorseCode("", wpm, hz, audio_format, rise_time, codec)
+        self.executor = executor
+
+    async def run(self, function, *args):
+        """ Run a function in the executor and wait for its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    async def encode(self, text):
+        """ Convert text to morse code"""
+        return await self.run(self.morse.codec.encode, text)
+
+    async def decode_text(self, mcode):
+        """ Convert morse code to text"""
+        return await self.run(self.morse.codec.decode, mcode)
+
+    async def render_wav(self, file_name, text):
+        """ Save the audio for the morse code of text to a WAV file, returns the number of frames"""
+        morse_code = await self.encode(text)
+        return await self.run(self.morse.write_wav, file_name, morse_code)
+
+    async def render_audio(self, file, text):
+        """ Save the audio for the morse code of text in the AudioFormat, returns the number of frames"""
+        morse_code = await self.encode(text)
+        return await self.run(self.morse.write_audio, file, morse_code)
+
+    async def decode_file(self, file_name, detector = "zero", block_size = None):
+        """ Decode a morse code audio(wav) file, returns the result of MorseCode.decode_audio"""
+        return await self.run(self.morse.decode_audio, file_name, detector, block_size)
+
+    async def iter_frames(self, morse_code):
+        """
+        Async generator that yields the audio frames for morse code one symbol
+        at a time.  The element frames are built in the executor the first
+        time they are needed at this wpm, tone, AudioFormat and rise time
+        """
+        # rendering nothing builds and caches the element frames
+        await self.run(self.morse.get_morse_frame, "")
+        for frames in self.morse.iter_morse_frames(morse_code):
+            yield frames
+
+    async def play(self, morse_code):
+        """ Play the morse code, cancelling it stops the audio"""
+        audio_format = self.morse.audio_format
+        player = MorsePlayer(self.morse.iter_morse_frames(morse_code), audio_format.sample_width)
+        player.start(self.morse.audio, audio_format.pyaudio_format, self.morse.CHANNELS, audio_format.rate)
+        try:
+            while(player.is_playing()):
+                await asyncio.sleep(0.05)
+        finally:
+            player.stop()
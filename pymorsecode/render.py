@@ -0,0 +1,319 @@
+import array
+import functools
+import math
+import re
+import types
+import wave
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .audio import AudioFormat, get_soundfile
+from .frozen import FrozenSlots
+from .timing import TimingProfile
+
+class AudioRenderer(FrozenSlots):
+
+    __slots__ = ("profile", "tone", "audio_format", "rise_time")
+
+    CHANNELS = 1
+    ELEMENT_CACHE_SIZE = 64
+
+    def __init__(self, profile = None, tone = 800, audio_format = None, rise_time = 0.0):
+        """
+        Renders morse code to audio frames and files.  Everything it renders
+        with is set when it is made and can not be changed, and the element
+        frames come from the caches of get_element_frames, so one renderer can be
+        shared by every thread of a pool
+
+        Parameters:
+            profile(TimingProfile): is the timing, or the wpm of a standard
+                one (10 by default)
+            tone(float): is the frequency of the tone
+            audio_format(AudioFormat): is how the audio is rendered, 16 bit
+                samples at RATE by default
+            rise_time(float): is the seconds each tone takes to rise and fall
+                (see check_rise_time), 0 for the tone to be switched on and off
+        """
+        if(not isinstance(profile, TimingProfile)):
+            profile = TimingProfile(10 if profile is None else profile)
+        if(audio_format is None):
+            audio_format = AudioFormat()
+        self._set(profile, self.check_tone(tone), audio_format,
+                  self.check_rise_time(rise_time, profile.unit))
+
+    @staticmethod
+    def check_tone(hz):
+        """ Get hz if it is a tone that can be rendered, raises ValueError if not"""
+        if(hz < 500 or hz > 1000):
+            raise ValueError("Tone must be between 500 and 1000")
+        return hz
+
+    @staticmethod
+    def check_rise_time(rise_time, unit):
+        """
+        Get rise_time if tones of a dot of unit seconds can rise and fall
+        over it.  Switching a tone straight on and off makes a click at each
+        end, so instead it can rise and fall over rise_time seconds along a
+        raised cosine (5ms is usual), and the tone carries on from the phase
+        the last one stopped at
+        """
+        if(rise_time < 0 or rise_time > unit / 2):
+            raise ValueError("Rise time must be between 0 and half a dot ({0}s)".format(unit / 2))
+        if(rise_time > 0 and numpy is None):
+            raise ImportError("numpy is needed to shape the tones")
+        return rise_time
+
+    def iter_frames(self, morse_code, audio_format = None):
+        """
+        Generator that yields the audio frames for morse code one symbol at a
+        time, so the whole message never has to be held in memory.  The frames
+        are in audio_format, self.audio_format by default
+        """
+        if(audio_format is None):
+            audio_format = self.audio_format
+        if(self.rise_time > 0):
+            yield from self.iter_shaped_frames(morse_code, audio_format)
+            return
+        elements = self.get_element_frames(self.tone, self.profile, audio_format.rate,
+                                           audio_format.sample_format)
+        previous = None
+        for x in morse_code:
+            # a space after a space finishes the gap between words
+            frames = elements.get("  " if x == " " and previous == " " else x)
+            previous = x
+            if(frames is not None):
+                yield frames
+
+    def iter_shaped_frames(self, morse_code, audio_format):
+        """ iter_frames for tones that rise and fall (see check_rise_time)"""
+        elements = self.get_shaped_elements(self.tone, self.profile, audio_format.rate,
+                                            audio_format.sample_format, self.rise_time)
+        dtype = audio_format.dtype
+        sample_width = audio_format.sample_width
+        # frames rendered so far, which give the phase the oscillator is at
+        frame_count = 0
+        previous = None
+        for x in morse_code:
+            element = elements.get("  " if x == " " and previous == " " else x)
+            previous = x
+            if(element is None):
+                continue
+            if(x == " "):
+                frame_count += len(element) // sample_width
+                yield element
+                continue
+            (cos_part, sin_part), gap = element
+            # the fraction of a wave done so far, as an angle
+            phase = (frame_count * self.tone / audio_format.rate) % 1.0 * (2 * math.pi)
+            wave_data = math.sin(phase) * cos_part + math.cos(phase) * sin_part
+            frame_count += len(cos_part) + len(gap) // sample_width
+            yield wave_data.astype(dtype).tobytes() + gap
+
+    def get_frames(self, morse_code):
+        """ Get the audio frames for morse code as a bytearray"""
+        return bytearray().join(self.iter_frames(morse_code))
+
+    def count_frames(self, morse_code, audio_format = None):
+        """
+        Get the number of frames iter_frames renders for morse code, worked
+        out from the number of each symbol without rendering it
+        """
+        if(audio_format is None):
+            audio_format = self.audio_format
+        dot, dash, gap, letter_space, word_space = self.get_element_lengths(self.profile, audio_format.rate)
+        spaces = morse_code.count(" ")
+        # the first space of a run is the gap between letters, the rest add the gap between words
+        word_spaces = spaces - len(re.findall(" +", morse_code))
+        return (morse_code.count(".") * (dot + gap) + morse_code.count("-") * (dash + gap)
+                + (spaces - word_spaces) * letter_space + word_spaces * word_space)
+
+    def write(self, file, morse_code, audio_format = None):
+        """
+        Write the audio for the morse code to a file name or binary file object
+        in audio_format (self.audio_format by default), with the container
+        taken from the file extension if the format has none.  The audio is
+        streamed to the file one morse symbol at a time so memory use does not
+        grow with the length of the message.  Returns the number of frames
+        """
+        if(audio_format is None):
+            audio_format = self.audio_format
+        audio_format = audio_format.for_file(file)
+        if(self.tone * 2 >= audio_format.rate):
+            raise ValueError("Sample rate must be more than twice the tone")
+        if(audio_format.container == "flac" and audio_format.sample_format != "int16"):
+            raise ValueError("FLAC can only store int16 samples")
+        frames = self.iter_frames(morse_code, audio_format)
+        if(audio_format.container == "raw"):
+            return self.write_raw(file, frames, audio_format)
+        if(audio_format.container == "wav" and audio_format.sample_format == "int16"):
+            return self.write_wave(file, frames, audio_format, self.count_frames(morse_code, audio_format))
+        frame_count = 0
+        soundfile = get_soundfile()
+        with soundfile.SoundFile(file, 'w', audio_format.rate, self.CHANNELS, audio_format.subtype,
+                                 format = AudioFormat.CONTAINERS[audio_format.container]) as sf:
+            for data in frames:
+                sf.buffer_write(data, dtype = audio_format.sample_format)
+                frame_count += len(data) // audio_format.sample_width
+        return frame_count
+
+    @classmethod
+    def write_wave(cls, file, frames, audio_format, total = None):
+        """
+        Write 16 bit frames to a WAV file name or binary file object with the
+        wave module, returns the number of frames.  total is the number of
+        frames that will be written, which goes in the header before them so
+        the file object does not need to be seekable (a pipe or stdout).
+        Without it the header is patched with the length once the frames are
+        written, which needs a seekable file
+        """
+        frame_count = 0
+        wf = wave.open(file, 'wb')
+        try:
+            wf.setnchannels(cls.CHANNELS)
+            wf.setsampwidth(audio_format.sample_width)
+            wf.setframerate(audio_format.rate)
+            if(total is not None):
+                wf.setnframes(total)
+            for data in frames:
+                # the header is patched when closed if the length is not total
+                wf.writeframesraw(data)
+                frame_count += len(data) // audio_format.sample_width
+        finally:
+            wf.close()
+        return frame_count
+
+    @staticmethod
+    def write_raw(file, frames, audio_format):
+        """ Write frames with no header to a file name or binary file object, returns the number of frames"""
+        frame_count = 0
+        output = file if hasattr(file, "write") else open(file, "wb")
+        try:
+            for data in frames:
+                output.write(data)
+                frame_count += len(data) // audio_format.sample_width
+        finally:
+            if(output is not file):
+                output.close()
+        return frame_count
+
+    @staticmethod
+    def silence_samples(frame_count, sample_width = 2):
+        """ Get frame_count samples of silence (sample_width bytes each) as bytes"""
+        return bytes(sample_width * frame_count)
+
+    @classmethod
+    def tone_samples(cls, frequency, frame_count, rate = None, sample_format = "int16"):
+        """
+        Get frame_count samples of a sine wave at frequency as bytes, 16 bit
+        or float32 (see AudioFormat) at rate (AudioFormat.RATE by default) samples a
+        second.  The whole buffer is computed in one go with numpy when it is
+        installed, otherwise it falls back to computing the samples one at a
+        time
+        """
+        if(rate is None):
+            rate = AudioFormat.RATE
+        scale = 32767 if sample_format == "int16" else 1.0
+        # number of frames per wave
+        frames_per_wave = rate / frequency
+        if(numpy is not None):
+            # which part of a wave each sample is, mapped to between 0 and 2*PI
+            wave_data = numpy.arange(frame_count) / frames_per_wave * (2 * math.pi)
+            wave_data = numpy.sin(wave_data) * scale
+            return wave_data.astype(AudioFormat.SAMPLE_FORMATS[sample_format][0]).tobytes()
+        if(sample_format == "int16"):
+            wave_data = array.array('h', [0]) * frame_count
+        else:
+            wave_data = array.array('f', [0.0]) * frame_count
+        for i in range(frame_count):
+            # b is which part of a single wave sample i is (0 being the start
+            # and 1 the end of the wave) and c maps b to between 0 and 2*PI,
+            # the repeating domain of the sine wave
+            b = i / frames_per_wave
+            c = b * (2 * math.pi)
+            value = math.sin(c) * scale
+            wave_data[i] = int(value) if sample_format == "int16" else value
+        return wave_data.tobytes()
+
+    @classmethod
+    @functools.lru_cache(maxsize=ELEMENT_CACHE_SIZE)
+    def get_element_frames(cls, tone, timing, rate = None, sample_format = "int16"):
+        """
+        Get the audio frames for each morse code symbol at a tone, timing (a
+        TimingProfile or the length of a dot of a standard one), sample rate
+        (AudioFormat.RATE by default) and sample format.  A dot or dash is the tone
+        followed by the gap between elements, a space is the rest of the gap
+        between letters and a second space ("  ") the rest of the gap between
+        words.  The frames are built once and cached for the most recently used
+        combinations so rendering is just joining buffers
+        """
+        if(rate is None):
+            rate = AudioFormat.RATE
+        sample_width = AudioFormat.SAMPLE_FORMATS[sample_format][1]
+        dot, dash, gap, letter_space, word_space = cls.get_element_lengths(timing, rate)
+        gap = cls.silence_samples(gap, sample_width)
+        elements = {
+            ".": cls.tone_samples(tone, dot, rate, sample_format) + gap,
+            "-": cls.tone_samples(tone, dash, rate, sample_format) + gap,
+            " ": cls.silence_samples(letter_space, sample_width),
+            "  ": cls.silence_samples(word_space, sample_width)
+        }
+        return types.MappingProxyType(elements)
+
+    @staticmethod
+    def get_element_lengths(timing, rate):
+        """
+        Get the number of frames of a dot, a dash, the gap after an element and
+        the spaces for the gaps between letters and words (see
+        TimingProfile.get_durations) for a TimingProfile or a dot length
+        """
+        if(isinstance(timing, TimingProfile)):
+            durations = timing.get_durations()
+        else:
+            durations = (timing, timing * 3, timing, timing * 3, timing * 3)
+        return [int(rate * duration) for duration in durations]
+
+    @staticmethod
+    def keying_envelope(frame_count, rise_frames):
+        """
+        Get the amplitude of a tone of frame_count frames that rises from 0 to
+        1 over its first rise_frames and falls back over its last rise_frames
+        along a raised cosine
+        """
+        envelope = numpy.ones(frame_count)
+        rise = 0.5 - 0.5 * numpy.cos(numpy.pi * (numpy.arange(rise_frames) + 0.5) / rise_frames)
+        envelope[:rise_frames] = rise
+        envelope[frame_count - rise_frames:] = rise[::-1]
+        return envelope
+
+    @classmethod
+    @functools.lru_cache(maxsize=ELEMENT_CACHE_SIZE)
+    def get_shaped_elements(cls, tone, timing, rate, sample_format, rise_time):
+        """
+        Get what is needed to build the shaped audio frames (see check_rise_time)
+        for each morse code symbol at any starting phase.  A dot or dash is
+        a pair of arrays, the tone's cosine and sine parts times the keying
+        envelope, and the bytes of the gap after it.  The spaces are just
+        bytes of silence.  A tone starting at phase p is sin(p) times the cosine
+        part plus cos(p) times the sine part, so the arrays are computed once
+        and cached like get_element_frames while every tone still starts at
+        the phase the oscillator has reached
+        """
+        sample_width = AudioFormat.SAMPLE_FORMATS[sample_format][1]
+        scale = 32767 if sample_format == "int16" else 1.0
+        dot, dash, gap, letter_space, word_space = cls.get_element_lengths(timing, rate)
+        rise_frames = max(1, int(rate * rise_time))
+        elements = {
+            " ": cls.silence_samples(letter_space, sample_width),
+            "  ": cls.silence_samples(word_space, sample_width)
+        }
+        for symbol, frame_count in ((".", dot), ("-", dash)):
+            wave_data = numpy.arange(frame_count) * (2 * math.pi * tone / rate)
+            envelope = cls.keying_envelope(frame_count, rise_frames) * scale
+            parts = (numpy.cos(wave_data) * envelope, numpy.sin(wave_data) * envelope)
+            for part in parts:
+                part.flags.writeable = False
+            elements[symbol] = (parts, cls.silence_samples(gap, sample_width))
+        return types.MappingProxyType(elements)
@@ -0,0 +1,388 @@
+import math
+
+from .frozen import FrozenSlots
+
+class TimingModel:
+
+    FIT_ELEMENTS = 64
+    ADAPT = 0.2
+    OUTLIER = 4.0
+
+    def __init__(self, unit, fastest = None, slowest = None):
+        """
+        Tells dots from dashes and the gaps between elements, letters and words
+        apart by how close their durations are to the centre of each kind.  The
+        centres are kept as logs of the durations so a change of speed moves
+        them all by the same amount, and each element moves the centre of its
+        kind (and half as much the others like it) so the model follows a
+        sender whose speed drifts.  Starts from tones of 1 and 3 dots and gaps
+        of 1, 4 and 7 dots (save_wav's letter gap is the 3 dot space plus the
+        dot after the last element) unless fitted to a recording with fit
+
+        Parameters:
+            tones(list): is the log centre for dots and dashes
+            gaps(list): is the log centre for gaps between elements, letters
+                and words
+            fastest, slowest(float): are the shortest and longest dot allowed
+            units(float): is the sum of the dot length of every tone
+            count(int): is the number of tones
+            shortest, longest(float): are the shortest and longest dot length
+                the model has had
+        """
+        self.tones = [math.log(unit), math.log(3 * unit)]
+        self.gaps = [math.log(unit), math.log(4 * unit), math.log(7 * unit)]
+        self.fastest = fastest
+        self.slowest = slowest
+        self.units = 0.0
+        self.count = 0
+        self.shortest = self.longest = unit
+
+    @classmethod
+    def fit(cls, tone_durations, gap_durations, fastest = None, slowest = None, profile = None):
+        """
+        Get a model fitted to the first FIT_ELEMENTS tone and gap durations of
+        a recording.  The tones are clustered (k-means on the log of the
+        durations) into dots and dashes and the gaps sorted by their length in
+        dots (see fit_gaps).  A kind missing from the recording, like dashes
+        in 'eeee' or gaps between words in a single word, is put where the
+        profile (a standard TimingProfile by default) expects it
+        """
+        if(profile is None):
+            profile = TimingProfile()
+        unit, dash_length, gap, letter_space, word_space = profile.get_durations()
+        dash_dots = math.log(dash_length / unit)
+        spacing = [math.log(gap / unit), math.log((gap + letter_space) / unit),
+                   math.log((gap + letter_space + word_space) / unit)]
+        tones = [math.log(max(x, 1e-6)) for x in tone_durations[:cls.FIT_ELEMENTS]]
+        gaps = [math.log(max(x, 1e-6)) for x in gap_durations[:cls.FIT_ELEMENTS]]
+        if(not tones):
+            raise ValueError("No tones found in the audio")
+        tone_centres = cls.cluster(tones, 2)
+        if(len(tone_centres) == 2):
+            dot, dash = tone_centres
+        elif(cls.is_dashes(tone_centres[0], cls.cluster(gaps, 4) if gaps else [], spacing, dash_dots,
+                           fastest, slowest, profile.unit)):
+            dot, dash = tone_centres[0] - dash_dots, tone_centres[0]
+        else:
+            dot, dash = tone_centres[0], tone_centres[0] + dash_dots
+        model = cls(math.exp(dot), fastest, slowest)
+        model.tones = [dot, dash]
+        model.gaps = cls.fit_gaps(gaps, dot, dash, spacing, dash_dots)
+        model.shortest = model.longest = model.unit
+        return model
+
+    @classmethod
+    def fit_gaps(cls, gaps, dot, dash, spacing, dash_dots):
+        """
+        Get the log centres of the gaps between elements, letters and words
+        from the log gap durations, the log dot and dash lengths, and the log
+        length in dots the profile expects of each kind of gap (spacing) and
+        of a dash.  A detector that finds tones a little short finds the gaps
+        after them as much too long, so a gap is measured together with a dot
+        before it.  The shortest of these periods are the gaps between
+        elements and the rest between letters and words: the shorter cluster
+        letters and the longer words if there are two (whatever their length,
+        so Farnsworth and odd spacing work), or told apart by their length
+        against the gaps between elements (or the dot) if there is one.  Gaps
+        longer than OUTLIER times the median of the rest are pauses, which
+        are gaps between words that are left out of the fit
+        """
+        periods = [math.log(math.exp(x) + 1) for x in spacing]
+        # a dot and a dash together are shortened by the same amount as one,
+        # so the dot they work out to is closer than the dot on its own
+        unit = math.log((math.exp(dot) + math.exp(dash)) / (1 + math.exp(dash_dots)))
+
+        def period(x):
+            return math.log(math.exp(x) + math.exp(dot)) - unit
+
+        split = (periods[0] + periods[1]) / 2
+        elements = [x for x in gaps if period(x) < split]
+        others = sorted(x for x in gaps if period(x) >= split)
+        if(others):
+            limit = period(others[len(others) // 2]) + math.log(cls.OUTLIER)
+            others = [x for x in others if period(x) <= limit]
+        centres = [None, None, None]
+        if(elements):
+            centres[0] = sum(elements) / len(elements)
+        clusters = cls.cluster(others, 2) if others else []
+        if(len(clusters) == 2):
+            centres[1], centres[2] = clusters
+        elif(clusters):
+            # measured against the gaps between elements if there are some,
+            # gaps much longer than a word gap are not the gaps between words
+            # at the speed of the tones but stretched gaps between letters
+            length = period(clusters[0])
+            if(centres[0] is not None):
+                length += periods[0] - period(centres[0])
+            word = (periods[1] + periods[2]) / 2 < length <= periods[2] + math.log(2)
+            centres[2 if word else 1] = clusters[0]
+        # a kind missing from the recording is put where the profile expects
+        # it from the ones next to it
+        if(centres[0] is None):
+            centres[0] = dot + spacing[0]
+            if(centres[1] is not None):
+                centres[0] = min(centres[0], centres[1] - math.log(1.5))
+        if(centres[1] is None):
+            centres[1] = centres[0] + spacing[1] - spacing[0]
+            if(centres[2] is not None):
+                centres[1] = min(centres[1], (centres[0] + centres[2]) / 2)
+        if(centres[2] is None):
+            centres[2] = centres[1] + max(spacing[2] - spacing[1], math.log(1.5))
+        return centres
+
+    @staticmethod
+    def is_dashes(tone, gap_centres, spacing, dash, fastest = None, slowest = None, unit = None):
+        """
+        Get if tones that are all about the same log length are dashes rather
+        than dots.  The gap centres are measured in dots both ways and the one
+        that fits the spacing (the log length in dots of each kind of gap)
+        better by more than log(1.5) wins, so 't t' is not taken for 'ee'.
+        When the gaps do not tell, the tones are tested against the geometric
+        midpoint of a dot and a dash (dash is its log length in dots) from
+        fastest, slowest and unit, so timing that is a little off does not
+        tip it
+        """
+        midpoint = dash / 2
+        dots_error = TimingModel.spacing_error(gap_centres, tone, spacing)
+        dashes_error = TimingModel.spacing_error(gap_centres, tone - dash, spacing)
+        if(abs(dots_error - dashes_error) > math.log(1.5)):
+            return dashes_error < dots_error
+        if(slowest is not None and tone > math.log(slowest) + midpoint):
+            return True
+        if(fastest is not None and tone < math.log(fastest) + midpoint):
+            return False
+        if(unit is not None):
+            return tone > math.log(unit) + midpoint
+        return False
+
+    @staticmethod
+    def spacing_error(gap_centres, dot, spacing):
+        """
+        Sum of how far (in log) each gap centre is from the nearest kind of
+        gap for a log dot length, gaps longer than OUTLIER word gaps are
+        pauses which fit any dot length
+        """
+        error = 0.0
+        for centre in gap_centres:
+            dots = centre - dot
+            if(dots < spacing[2] + math.log(TimingModel.OUTLIER)):
+                error += min(abs(dots - x) for x in spacing)
+        return error
+
+    @classmethod
+    def from_profile(cls, profile, fastest = None, slowest = None):
+        """ Get a model starting from the lengths of a TimingProfile"""
+        dot, dash, gap, letter_space, word_space = profile.get_durations()
+        model = cls(dot, fastest, slowest)
+        model.tones = [math.log(dot), math.log(dash)]
+        model.gaps = [math.log(gap), math.log(gap + letter_space), math.log(gap + letter_space + word_space)]
+        return model
+
+    @staticmethod
+    def cluster(values, k):
+        """
+        1-D k-means: get the sorted centres of up to k clusters of values.  In
+        one dimension the clusters are runs of the sorted values, so the best
+        split is found exactly (least squared distance from the centres) by
+        dynamic programming rather than from a starting guess.  Clusters with
+        centres within log(1.5) of each other are merged
+        """
+        values = sorted(values)
+        count = len(values)
+        if(k == 1 or values[-1] - values[0] < math.log(1.5)):
+            return [sum(values) / count]
+        k = min(k, count)
+        sums = [0.0]
+        squares = [0.0]
+        for value in values:
+            sums.append(sums[-1] + value)
+            squares.append(squares[-1] + value * value)
+
+        def cost(i, j):
+            return squares[j] - squares[i] - (sums[j] - sums[i]) ** 2 / (j - i)
+
+        # best[j] is the least cost of splitting the first j values so far and
+        # splits[c][j] where its last cluster starts
+        best = [cost(0, j) if j else 0.0 for j in range(count + 1)]
+        splits = [[0] * (count + 1)]
+        for c in range(1, k):
+            row = best
+            best = [0.0] * (count + 1)
+            split = [0] * (count + 1)
+            for j in range(c + 1, count + 1):
+                best[j], split[j] = min((row[i] + cost(i, j), i) for i in range(c, j))
+            splits.append(split)
+        bounds = [count]
+        for c in range(k - 1, 0, -1):
+            bounds.append(splits[c][bounds[-1]])
+        bounds.append(0)
+        bounds.reverse()
+        centres = [(sums[j] - sums[i]) / (j - i) for i, j in zip(bounds, bounds[1:])]
+        counts = [j - i for i, j in zip(bounds, bounds[1:])]
+        merged = []
+        for centre, count in zip(centres, counts):
+            if(merged and centre - merged[-1][0] < math.log(1.5)):
+                total = merged[-1][1] + count
+                merged[-1] = ((merged[-1][0] * merged[-1][1] + centre * count) / total, total)
+            else:
+                merged.append((centre, count))
+        return [centre for centre, count in merged]
+
+    @property
+    def unit(self):
+        """ The current length of a dot"""
+        return math.exp(self.tones[0])
+
+    @property
+    def wpm(self):
+        """ The current speed in words per minute"""
+        return TimingProfile.MIN / (TimingProfile.PARIS * self.unit)
+
+    @property
+    def average_wpm(self):
+        """ The speed in words per minute over all the tones so far"""
+        if(self.count == 0):
+            return self.wpm
+        return TimingProfile.MIN / (TimingProfile.PARIS * self.units / self.count)
+
+    @staticmethod
+    def nearest(centres, value):
+        """ Index of the centre a log duration is closest to"""
+        i = 0
+        while(i + 1 < len(centres) and value >= (centres[i] + centres[i + 1]) / 2):
+            i += 1
+        return i
+
+    @staticmethod
+    def adapt(centres, i, value, rate):
+        """ Move centre i towards value and the other centres half as far"""
+        delta = rate * (value - centres[i])
+        for j in range(len(centres)):
+            centres[j] += delta if j == i else delta / 2
+
+    def tone(self, duration):
+        """ Get if a tone is a dot '.' or a dash '-' and learn from it"""
+        value = math.log(max(duration, 1e-6))
+        i = self.nearest(self.tones, value)
+        self.adapt(self.tones, i, value, self.ADAPT)
+        if(self.fastest is not None and self.unit < self.fastest):
+            self.adapt(self.tones, 0, math.log(self.fastest), 1)
+        if(self.slowest is not None and self.unit > self.slowest):
+            self.adapt(self.tones, 0, math.log(self.slowest), 1)
+        self.units += duration / 3 if i else duration
+        self.count += 1
+        self.shortest = min(self.shortest, self.unit)
+        self.longest = max(self.longest, self.unit)
+        return "-" if i else "."
+
+    def gap(self, duration, learn = True):
+        """
+        Get the number of spaces for a gap, none between elements, one between
+        letters and two between words, and learn from it unless learn is False
+        (for a gap that has not finished yet)
+        """
+        value = math.log(max(duration, 1e-6))
+        i = self.nearest(self.gaps, value)
+        # a pause between overs is a gap between words but says nothing about
+        # how long they are
+        if(learn and value < self.gaps[2] + math.log(2)):
+            self.adapt(self.gaps, i, value, self.ADAPT)
+        return i
+
+
+class TimingProfile(FrozenSlots):
+
+    __slots__ = ("unit", "effective_wpm", "dash", "element_gap", "letter_gap", "word_gap")
+
+    PARIS = 40
+    MIN = 60
+    MIN_WPM = 1
+    MAX_WPM = 60
+
+    def __init__(self, wpm = 10, effective_wpm = None, dash = 3, element_gap = 1, letter_gap = 4, word_gap = 7):
+        """
+        The timing of morse code: the speed the letters are sent at (wpm), the
+        lengths of each part in dots and, for Farnsworth timing, a slower
+        effective_wpm reached by stretching only the gaps between letters and
+        words.  The gaps are from the end of one tone to the start of the next
+        so the default letter gap of 4 is the 3 dot space save_wav has always
+        used plus the dot after the last element (3 is the ITU standard).  A
+        profile can not be changed once made, so it can be shared and used as
+        the key of the element frame caches
+
+        Parameters:
+            unit(float): is the length of a dot in seconds at wpm
+            effective_wpm(float): is the overall speed with the gaps stretched,
+                None for no Farnsworth timing
+            dash(float): is the length of a dash in dots
+            element_gap(float): is the gap between the elements of a letter
+            letter_gap(float): is the gap between letters
+            word_gap(float): is the gap between words
+        """
+        if(wpm < self.MIN_WPM or wpm > self.MAX_WPM):
+            raise ValueError("WPM must be between {0} and {1}".format(self.MIN_WPM, self.MAX_WPM))
+        if(effective_wpm is not None and (effective_wpm < self.MIN_WPM or effective_wpm > wpm)):
+            raise ValueError("Effective WPM must be between {0} and the WPM".format(self.MIN_WPM))
+        if(dash <= 1 or element_gap <= 0):
+            raise ValueError("A dash must be longer than a dot and the element gap above 0")
+        if(letter_gap < element_gap or word_gap < letter_gap):
+            raise ValueError("Gaps must not be shorter than the gaps within them")
+        self._set(TimingProfile.MIN / (TimingProfile.PARIS * wpm), effective_wpm, dash, element_gap, letter_gap, word_gap)
+
+    def __eq__(self, other):
+        return isinstance(other, TimingProfile) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return "TimingProfile({0!r}, {1!r}, {2!r}, {3!r}, {4!r}, {5!r})".format(self.wpm, *self.key()[1:])
+
+    def key(self):
+        """ Tuple of everything that sets the timing"""
+        return (self.unit, self.effective_wpm, self.dash, self.element_gap, self.letter_gap, self.word_gap)
+
+    @property
+    def wpm(self):
+        """ Speed the letters are sent at in words per minute"""
+        return TimingProfile.MIN / (TimingProfile.PARIS * self.unit)
+
+    def with_unit(self, unit):
+        """ Get the same profile with a dot of unit seconds"""
+        profile = object.__new__(TimingProfile)
+        effective_wpm = self.effective_wpm
+        if(effective_wpm is not None and effective_wpm >= TimingProfile.MIN / (TimingProfile.PARIS * unit)):
+            effective_wpm = None
+        profile._set(unit, effective_wpm, self.dash, self.element_gap, self.letter_gap, self.word_gap)
+        return profile
+
+    @property
+    def spacing_unit(self):
+        """
+        Length in seconds of a dot of the gaps between letters and words.  For
+        Farnsworth timing it is stretched so the word PARIS takes as long as
+        at effective_wpm with the letters still sent at wpm
+        """
+        if(self.effective_wpm is None or self.effective_wpm >= self.wpm):
+            return self.unit
+        # dots, dashes and element gaps inside the letters of PARIS, and the
+        # gaps between its letters and after the word
+        letters = 10 + 4 * self.dash + 9 * self.element_gap
+        gaps = 4 * self.letter_gap + self.word_gap
+        word = TimingProfile.MIN / (TimingProfile.PARIS * self.effective_wpm) * (letters + gaps)
+        return (word - letters * self.unit) / gaps
+
+    def get_durations(self):
+        """
+        Get the seconds of a dot, a dash, the gap after each element, the space
+        added for the gap between letters and the space added on top of that
+        for the gap between words
+        """
+        unit = self.unit
+        spacing = self.spacing_unit
+        if(spacing == unit):
+            letter_space = unit * (self.letter_gap - self.element_gap)
+        else:
+            letter_space = self.letter_gap * spacing - self.element_gap * unit
+        word_space = spacing * (self.word_gap - self.letter_gap)
+        return (unit, unit * self.dash, unit * self.element_gap, letter_space, word_space)
@@ -148,12 +148,13 @@ class MyFrame(wx.Frame):
 
     def onExit(self, event):  # wxGlade: MyFrame.<event_handler>
         print("Closing program")
+        self.morse.stop_morse()
         self.Destroy()
 
     def onPlay(self, event):  # wxGlade: MyFrame.<event_handler>
         print("Playing morse code")
         morse_code = self.text_ctrl_morsecode.GetValue()
-        self.morse.play_morse(morse_code)
+        self.morse.start_morse(morse_code)
 
     def onWpm(self, event):
         wpm = self.spin_ctrl_wpm.GetValue()
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymorsecode import AudioFormat, AudioRenderer, MorseCode, TimingProfile
+
+RATE = 8000
+
+def render_samples(text, profile = 10, hz = 800, rate = RATE):
+    """ Render text to 16 bit mono samples (a numpy array) at rate"""
+    numpy = pytest.importorskip("numpy")
+    if(not isinstance(profile, TimingProfile)):
+        profile = TimingProfile(profile)
+    renderer = AudioRenderer(profile, hz, AudioFormat(rate))
+    frames = renderer.get_frames(MorseCode.get_text_codec().encode(text))
+    return numpy.frombuffer(bytes(frames), dtype = "<i2")
+
+def add_noise(samples, level, seed = 0):
+    """ Add gaussian noise with a standard deviation of level to the samples"""
+    numpy = pytest.importorskip("numpy")
+    noise = numpy.random.default_rng(seed).normal(0, level, len(samples))
+    return numpy.clip(samples + noise, -32768, 32767).astype("<i2")
+
+def write_wav(path, samples, rate = RATE):
+    """ Write samples to a 16 bit WAV file, returns its name"""
+    soundfile = pytest.importorskip("soundfile")
+    soundfile.write(str(path), samples, rate, subtype = "PCM_16")
+    return str(path)
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from pymorsecode import MorseCode, MorseDecoder, MorseTree, TextCodec
+
+def feed_chunks(decoder, mcode, sizes):
+    text = []
+    start = 0
+    for size in sizes:
+        text.append(decoder.feed(mcode[start:start + size]))
+        start += size
+    text.append(decoder.feed(mcode[start:]))
+    return "".join(text) + decoder.flush()
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_feed_matches_decode(size):
+    codec = MorseCode.get_text_codec()
+    mcode = codec.encode("cq cq de k1abc <ar> 73, 5nn?")
+    decoder = codec.get_decoder()
+    assert feed_chunks(decoder, mcode, [size] * (len(mcode) // size)) == codec.decode(mcode)
+    # the decoder starts again after a flush
+    assert decoder.decode(mcode) == codec.decode(mcode)
+
+@pytest.mark.parametrize("unknown", ["raise", "skip"])
+@pytest.mark.parametrize("dot", [".", "*"])
+def test_feed_fuzz(unknown, dot):
+    # any symbols, including letters with no character and runs of spaces,
+    # split into chunks anywhere
+    codec = TextCodec(MorseCode.morse, TextCodec.DEFAULT_ALPHABETS, unknown, dot = dot)
+    rng = random.Random(7)
+    for _ in range(2000):
+        mcode = "".join(rng.choice(dot + "-  ") for _ in range(rng.randrange(40)))
+        sizes = [rng.randrange(1, 6) for _ in range(rng.randrange(5))]
+        assert feed_chunks(codec.get_decoder(), mcode, sizes) == codec.decode(mcode)
+
+def test_to_string():
+    morse = MorseCode("paris paris")
+    assert morse.to_string(morse.morse_code) == "paris paris "
+    assert morse.get_decoder().decode(morse.morse_code) == "paris paris "
+
+def test_tree_can_not_be_changed():
+    codec = MorseCode.get_text_codec()
+    tree = codec.tree
+    assert isinstance(tree.letters, tuple)
+    assert tree.letters[tree.step(tree.step(0, "."), "-")] == "a"
+    with pytest.raises(AttributeError):
+        tree.dot = "-"
+    with pytest.raises(AttributeError):
+        tree.letters = ()
+    with pytest.raises(TypeError):
+        tree.letters[1] = "t"
+    assert codec.decode(".- ") == "a "
+
+def test_tree_skips_other_symbols():
+    tree = MorseTree({"a": ".-", "b": ".x"})
+    assert "b" not in tree.letters
+    assert MorseDecoder(tree).decode(".- .x") == "a "
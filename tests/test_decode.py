@@ -0,0 +1,79 @@
+import glob
+import os
+
+import pytest
+
+import pymorsecode
+from conftest import RATE, render_samples, write_wav
+from pymorsecode import AudioDecoder, MorseCode, SegmentTable, TimingProfile
+
+numpy = pytest.importorskip("numpy")
+pytest.importorskip("soundfile")
+
+DATA = sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "*.wav")))
+
+def decode(file_name, block_size = None):
+    try:
+        return AudioDecoder(None, 800, "zero", block_size).decode(file_name)
+    except ValueError as error:
+        return str(error)
+
+def split_blocks(samples, block_size):
+    return [samples[start:start + block_size] for start in range(0, len(samples), block_size)]
+
+@pytest.mark.parametrize("block_size", [1000, 4096, 65536])
+@pytest.mark.parametrize("file_name", DATA, ids = os.path.basename)
+def test_blocks_match_whole_file(file_name, block_size):
+    assert decode(file_name, block_size) == decode(file_name)
+
+@pytest.mark.parametrize("block_size", [1, 7, 4096])
+def test_blocks_match_rendered(tmp_path, block_size):
+    file_name = write_wav(tmp_path / "paris.wav", render_samples("paris paris", 20))
+    result = decode(file_name, block_size)
+    assert result == decode(file_name)
+    assert result["text"].strip() == "paris paris"
+
+@pytest.mark.parametrize("block_size", [1, 333, 100000])
+def test_iter_segments(block_size):
+    samples = render_samples("cq de k1abc", 20)
+    whole = SegmentTable.from_arrays(*MorseCode.get_segments(samples, RATE))
+    table = SegmentTable()
+    for part in MorseCode.iter_segments(split_blocks(samples, block_size), RATE):
+        table.extend(part)
+    assert table.to_list() == whole.to_list()
+
+@pytest.mark.parametrize("block_size", [1, 333, 100000])
+def test_iter_samples(block_size):
+    samples = render_samples("cq de k1abc", 20)
+    whole = SegmentTable.from_arrays(*MorseCode.get_segments(samples, RATE))
+    table = SegmentTable()
+    for part in MorseCode.iter_samples(split_blocks(samples.tolist(), block_size), RATE):
+        table.extend(part)
+    assert table.to_list() == whole.to_list()
+
+def test_segments_without_numpy(monkeypatch):
+    samples = render_samples("cq de k1abc", 20)
+    whole = MorseCode.get_samples(samples, RATE)
+    monkeypatch.setattr(pymorsecode.decode, "numpy", None)
+    assert MorseCode.get_samples(samples.tolist(), RATE).to_list() == whole.to_list()
+    table = SegmentTable()
+    for part in MorseCode.iter_segments(split_blocks(samples.tolist(), 500), RATE):
+        table.extend(part)
+    assert table.to_list() == whole.to_list()
+
+def test_segment_table():
+    samples = render_samples("paris", 20)
+    table = MorseCode.fix_zero_crossing(MorseCode.get_samples(samples, RATE), RATE)
+    assert table.states[0]
+    assert list(table.states) == [state for state, start, stop, duration in table]
+    assert SegmentTable.from_list(table.to_list()).to_list() == table.to_list()
+    # the tones run from their first to their last zero crossing
+    dot = TimingProfile(20).unit
+    tones = table.get_durations(True)
+    assert len(tones) == 14
+    assert all(min(abs(duration - dot), abs(duration - 3 * dot)) < 0.002 for duration in tones)
+
+def test_no_audio():
+    assert len(MorseCode.get_samples(numpy.zeros(0, dtype = "<i2"), RATE)) == 0
+    with pytest.raises(ValueError, match = "No tones"):
+        AudioDecoder().decode_samples(numpy.zeros(0, dtype = "<i2"), RATE)
@@ -0,0 +1,33 @@
+import pytest
+
+from conftest import RATE, add_noise, render_samples
+from pymorsecode import AudioDecoder
+
+numpy = pytest.importorskip("numpy")
+
+def decode(samples, detector):
+    return AudioDecoder(None, 800, detector).decode_samples(samples, RATE)["text"].strip()
+
+@pytest.mark.parametrize("detector", ["goertzel", "rms"])
+@pytest.mark.parametrize("level", [30, 3000])
+def test_noisy(detector, level):
+    assert decode(add_noise(render_samples("cq de k1abc", 15), level), detector) == "cq de k1abc"
+
+@pytest.mark.parametrize("detector", ["goertzel", "rms"])
+@pytest.mark.parametrize("level", [30, 3000])
+def test_sparse_tone_in_noise(detector, level):
+    # a minute of noise either side, the tone is about 5% of the recording
+    over = render_samples("cq de k1abc", 15)
+    noise = numpy.zeros(RATE * 60, dtype = over.dtype)
+    samples = add_noise(numpy.concatenate((noise, over, noise)), level)
+    assert decode(samples, detector) == "cq de k1abc"
+
+@pytest.mark.parametrize("detector", ["goertzel", "rms"])
+def test_noise_only(detector):
+    with pytest.raises(ValueError, match = "No tones"):
+        decode(add_noise(numpy.zeros(RATE * 30, dtype = "<i2"), 3000), detector)
+
+@pytest.mark.parametrize("detector", ["zero", "goertzel", "rms"])
+def test_silence(detector):
+    with pytest.raises(ValueError, match = "No tones"):
+        decode(numpy.zeros(RATE, dtype = "<i2"), detector)
@@ -0,0 +1,46 @@
+import pytest
+
+from conftest import RATE, add_noise, render_samples, write_wav
+from pymorsecode import AudioDecoder, MorseListener
+
+numpy = pytest.importorskip("numpy")
+
+def listen(listener, samples, chunk_size):
+    text = []
+    for start in range(0, len(samples), chunk_size):
+        text.append(listener.feed(samples[start:start + chunk_size]))
+    text.append(listener.flush())
+    return "".join(text)
+
+@pytest.mark.parametrize("detector", ["goertzel", "rms"])
+@pytest.mark.parametrize("wpm", [5, 40])
+def test_fit(detector, wpm):
+    # the timing is fitted to the start rather than followed from the wrong wpm
+    samples = add_noise(render_samples("cq cq de k1abc k1abc k", 20), 300)
+    listener = MorseListener(RATE, wpm, 800, detector, fit = True)
+    listener.morse_code = []
+    assert listen(listener, samples, 4096).strip() == "cq cq de k1abc k1abc k"
+    assert listener.pending is None
+    assert abs(listener.timing.average_wpm - 20) < 2
+    assert "".join(listener.morse_code).strip() == "-.-. --.-  -.-. --.-  -.. .  -.- .---- .- -... -.-.  " \
+        "-.- .---- .- -... -.-.  -.-"
+
+@pytest.mark.parametrize("detector", ["goertzel", "rms"])
+def test_fit_blocks(tmp_path, detector):
+    file_name = write_wav(tmp_path / "cq.wav", add_noise(render_samples("cq de k1abc", 30), 300))
+    result = AudioDecoder(10, 800, detector, 1000).decode(file_name)
+    assert result["text"].strip() == "cq de k1abc"
+    assert abs(result["wpm"] - 30) < 3
+
+@pytest.mark.parametrize("detector", ["goertzel", "rms"])
+@pytest.mark.parametrize("level", [0, 1000])
+@pytest.mark.parametrize("chunk_size", [1, 333, None])
+def test_raw_pcm(detector, level, chunk_size):
+    # bytes of 16 bit PCM split anywhere, even inside a sample
+    samples = render_samples("de k1a", 25)
+    if(level):
+        samples = add_noise(samples, level)
+    data = samples.astype("<i2").tobytes()
+    listener = MorseListener(RATE, 25, 800, detector)
+    assert listen(listener, data, chunk_size or len(data)).strip() == "de k1a"
+    assert listener.extra == b""
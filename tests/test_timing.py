@@ -0,0 +1,66 @@
+import math
+
+import pytest
+
+from conftest import RATE, render_samples, write_wav
+from pymorsecode import AudioDecoder, TimingModel, TimingProfile
+
+numpy = pytest.importorskip("numpy")
+
+DETECTORS = ("zero", "rms", "goertzel")
+
+def decode(samples, profile, detector):
+    return AudioDecoder(profile, 800, detector).decode_samples(samples, RATE)["text"].strip()
+
+@pytest.mark.parametrize("detector", DETECTORS)
+@pytest.mark.parametrize("text, wpm", [
+    ("sss", 5), ("eish 5", 5), ("ee ee", 5), ("tt tt", 5), ("tt tt", 25), ("mm", 25),
+    ("e", 5), ("t", 25), ("o", 20), ("eee eee", 15)])
+def test_all_dots_or_all_dashes(text, wpm, detector):
+    assert decode(render_samples(text, wpm), wpm, detector) == text
+
+@pytest.mark.parametrize("detector", DETECTORS)
+@pytest.mark.parametrize("text, wpm", [("a i", 10), ("k 7 x", 10), ("t t", 15), ("e e", 10), ("m m", 20), ("i a", 5)])
+def test_one_letter_words(text, wpm, detector):
+    assert decode(render_samples(text, wpm), wpm, detector) == text
+
+@pytest.mark.parametrize("detector", DETECTORS)
+@pytest.mark.parametrize("pause", [5, 30])
+def test_pause_between_overs(pause, detector):
+    over = render_samples("cq de k1abc", 20)
+    samples = numpy.concatenate((over, numpy.zeros(RATE * pause, dtype = over.dtype), over))
+    assert decode(samples, None, detector) == "cq de k1abc cq de k1abc"
+
+@pytest.mark.parametrize("detector", DETECTORS)
+def test_pause_between_overs_in_blocks(tmp_path, detector):
+    over = render_samples("cq de k1abc", 10)
+    samples = numpy.concatenate((over, numpy.zeros(RATE * 5, dtype = over.dtype), over))
+    file_name = write_wav(tmp_path / "overs.wav", samples)
+    result = AudioDecoder(None, 800, detector, 4096).decode(file_name)
+    assert result["text"].strip() == "cq de k1abc cq de k1abc"
+
+@pytest.mark.parametrize("profile", [None, TimingProfile(20, 8)])
+def test_farnsworth(profile):
+    text = "paris big cat"
+    assert decode(render_samples(text, TimingProfile(20, 8)), profile, "zero") == text
+
+def test_itu_letter_gap():
+    text = "the quick brown fox"
+    assert decode(render_samples(text, TimingProfile(15, letter_gap = 3)), None, "zero") == text
+
+def test_fit_gaps_in_dots():
+    dot = 0.1
+    tones = [dot, 3 * dot] * 10
+    # element and word gaps only, as in 'a i'
+    model = TimingModel.fit(tones, [dot] * 10 + [7 * dot] * 3)
+    assert [model.gap(x, False) for x in (dot, 4 * dot, 7 * dot)] == [0, 1, 2]
+    # a long pause does not take the place of the word gaps
+    model = TimingModel.fit(tones, [dot] * 10 + [4 * dot] * 10 + [7 * dot] * 3 + [300 * dot])
+    assert [model.gap(x, False) for x in (dot, 4 * dot, 7 * dot, 300 * dot)] == [0, 1, 2, 2]
+    assert math.exp(model.gaps[2]) == pytest.approx(7 * dot)
+
+def test_pause_is_not_learned():
+    model = TimingModel.from_profile(TimingProfile(10))
+    gaps = list(model.gaps)
+    assert model.gap(30.0) == 2
+    assert model.gaps == gaps